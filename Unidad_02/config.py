@@ -1,3 +1,7 @@
+from types import MappingProxyType
+from typing import NamedTuple
+
+import numpy as np
 
 # Sensor configuration (min, max values)
 SENSORS = {
@@ -27,3 +31,56 @@ WEIGHTS = {
 ALPHA = 0.3  # Satisfaction weight
 BETA = 0.7   # Energy weight
 CORRECTION_COEFFICIENT = 0.2  # "x" in the algorithm
+
+# Lookup cache for the scalar satisfaction/energy functions
+SCORE_CACHE_SIZE = 4096     # Entries per function (oldest evicted when full); 0 disables the cache
+SCORE_CACHE_QUANTUM = 1.0   # Only inputs that are multiples of this step are cached (integer readings)
+
+# Compiled sensor specification table
+class SensorSpec(NamedTuple):
+    """One sensor's compiled parameters as plain floats (for scalar code)."""
+    index: int
+    name: str
+    min: float
+    max: float
+    inv_range: float  # 1 / (max - min)
+    sign: float       # +1 minimization, -1 maximization
+    bound: float      # value that needs no energy to keep: min (minimization) or max (maximization)
+    cost: float
+    weight: float
+
+class SensorSpecTable:
+    """
+    Immutable, array-backed view of SENSORS, COSTS and WEIGHTS compiled once.
+    Each parameter is a contiguous read-only NumPy column in `names` order
+    (for batch code); `rows`/`by_name` hold the same values as SensorSpec tuples.
+    """
+    def __init__(self, sensors, costs, weights):
+        names = tuple(sensors)
+        minimum = [float(sensors[s]["min"]) for s in names]
+        maximum = [float(sensors[s]["max"]) for s in names]
+        sign = [1.0 if sensors[s]["type"] == "minimization" else -1.0 for s in names]
+        rows = tuple(
+            SensorSpec(i, s, minimum[i], maximum[i], 1.0 / (maximum[i] - minimum[i]), sign[i],
+                       minimum[i] if sign[i] > 0 else maximum[i], float(costs[s]), float(weights.get(s, 0.0)))
+            for i, s in enumerate(names)
+        )
+        
+        def column(field):
+            values = np.array([getattr(row, field) for row in rows], dtype=float)
+            values.flags.writeable = False
+            return values
+        
+        object.__setattr__(self, "names", names)
+        object.__setattr__(self, "rows", rows)
+        object.__setattr__(self, "by_name", MappingProxyType({row.name: row for row in rows}))
+        for field in ("min", "max", "inv_range", "sign", "bound", "cost", "weight"):
+            object.__setattr__(self, field, column(field))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("SensorSpecTable is immutable")
+    
+    def __len__(self):
+        return len(self.rows)
+
+SPEC = SensorSpecTable(SENSORS, COSTS, WEIGHTS)
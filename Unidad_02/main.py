@@ -1,10 +1,11 @@
 
-import numpy as np
-from config import SENSORS, WEIGHTS, ALPHA, BETA
+from config import SPEC, WEIGHTS, ALPHA, BETA
 from sensor_data import generate_sensor_values, get_median_values, get_test_scenarios
 from satisfaction import calculate_overall_satisfaction, calculate_overall_energy_cost
+from optimizer import optimize_scenarios
+from pareto import ParetoFront
 from smoothing import apply_both_methods
-from visualization import display_sensor_comparison, plot_satisfaction_levels
+from visualization import display_sensor_comparison, plot_satisfaction_levels, plot_pareto_front
 
 def process_sensor_data_with_smoothing():
     """Process sensor data using both smoothing methods and compare."""
@@ -46,28 +47,19 @@ def evaluate_scenarios():
     """Evaluate satisfaction and energy costs for different scenarios."""
     scenarios = get_test_scenarios()
     
-    # Define a set of recommended values (Vo) for each scenario
-    recommended_values = []
-    for scenario in scenarios:
-        rec_values = {}
-        for sensor, value in scenario.items():
-            config = SENSORS[sensor]
-            # Generate a recommended value within sensor's min-max range
-            rec_values[sensor] = np.clip(
-                value * np.random.uniform(0.85, 1.15),  # Vary by +/- 15%
-                config["min"],
-                config["max"]
-            )
-        recommended_values.append(rec_values)
+    # Find the recommended values (Vo) that maximise the objective, all scenarios at once
+    recommended_values, _ = optimize_scenarios(scenarios)
     
     # Calculate satisfaction and energy costs
     results = {}
     for i, (current, recommended) in enumerate(zip(scenarios, recommended_values)):
         satisfaction = calculate_overall_satisfaction(current, recommended, WEIGHTS)
+        # Satisfaction of the state reached by applying the recommendation
+        expected_satisfaction = calculate_overall_satisfaction(recommended, recommended, WEIGHTS)
         energy_cost = calculate_overall_energy_cost(current, recommended, WEIGHTS)
         
-        # Combined objective function
-        objective = ALPHA * satisfaction + BETA * energy_cost
+        # Combined objective function, from the values printed below (what the optimizer maximised)
+        objective = ALPHA * expected_satisfaction + BETA * energy_cost
         
         results[f"Scenario {i+1}"] = objective
         
@@ -75,6 +67,7 @@ def evaluate_scenarios():
         print(f"Current values: {current}")
         print(f"Recommended values: {recommended}")
         print(f"Satisfaction: {satisfaction:.4f}")
+        print(f"Satisfaction at recommended values: {expected_satisfaction:.4f}")
         print(f"Energy cost satisfaction: {energy_cost:.4f}")
         print(f"Objective function (α={ALPHA}, β={BETA}): {objective:.4f}")
     
@@ -83,6 +76,21 @@ def evaluate_scenarios():
     
     return scenarios, recommended_values, results
 
+def explore_tradeoffs(current, weightings=((0.1, 0.9), (ALPHA, BETA), (0.5, 0.5), (0.9, 0.1))):
+    """Compute the satisfaction/energy Pareto front once and answer several weightings from it."""
+    front = ParetoFront([current[s] for s in SPEC.names])
+    print(f"Current values: {current}")
+    print(f"Pareto front: {len(front)} of {front.candidates_evaluated} candidate recommendations")
+    
+    for alpha, beta in weightings:
+        recommended, objective = front.best(alpha, beta)
+        print(f"\nα={alpha}, β={beta}: objective {objective:.4f}")
+        print(f"Recommended values: {recommended}")
+    
+    plot_pareto_front(front, weightings)
+    
+    return front
+
 def main():
     print("=" * 80)
     print("UNIDAD 02 PROJECT: SENSOR DATA PROCESSING AND SMOOTHING")
@@ -96,6 +104,10 @@ def main():
     print("\n--- Part 2: Evaluating Satisfaction and Energy Costs ---")
     scenarios, recommendations, results = evaluate_scenarios()
     
+    # Satisfaction vs. energy trade-off for the first scenario
+    print("\n--- Part 3: Satisfaction vs. Energy Trade-off ---")
+    front = explore_tradeoffs(scenarios[0])
+    
     print("\nProject execution completed successfully!")
 
 if __name__ == "__main__":
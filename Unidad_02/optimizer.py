@@ -0,0 +1,63 @@
+import numpy as np
+from config import SPEC, ALPHA, BETA
+from satisfaction import batch_satisfaction, batch_energy_cost
+
+def sensor_scores(current_values, recommended_values, weights=None, alpha=ALPHA, beta=BETA):
+    """
+    Weighted per-sensor objective of recommending `recommended_values` from `current_values`:
+    satisfaction of the state the recommendation leads to, plus energy satisfaction of getting there.
+    Arrays broadcast against the sensor axis (last axis, SPEC.names order).
+    """
+    weight = SPEC.weight if weights is None else np.array([weights[s] for s in SPEC.names], dtype=float)
+    satisfaction = batch_satisfaction(recommended_values)
+    energy = batch_energy_cost(current_values, recommended_values)
+    return weight * (alpha * satisfaction + beta * energy)
+
+def recommendation_objective(current_values, recommended_values, weights=None, alpha=ALPHA, beta=BETA):
+    """ALPHA*satisfaction + BETA*energy for (n_scenarios, n_sensors) arrays; returns (n_scenarios,)."""
+    return sensor_scores(current_values, recommended_values, weights, alpha, beta).sum(axis=-1)
+
+def optimize_recommendations(current_values, grid_points=17, levels=4, weights=None, alpha=ALPHA, beta=BETA):
+    """
+    Find the recommended values (Vo) that maximise the objective for every scenario at once.
+    
+    The objective is a weighted sum of per-sensor terms, so each sensor is optimised
+    independently: a coarse grid over [min, max] is refined `levels` times around the best
+    point, and the current value (where the energy cost drops to zero) is always a candidate.
+    Returns (recommended, objective) with shapes (n_scenarios, n_sensors) and (n_scenarios,).
+    """
+    current = np.atleast_2d(np.asarray(current_values, dtype=float))
+    
+    # Coarse grid spanning each sensor's range: (1, grid_points, n_sensors)
+    steps = np.linspace(0.0, 1.0, grid_points)[:, None]
+    low = np.broadcast_to(SPEC.min, current.shape)
+    width = np.broadcast_to(SPEC.max - SPEC.min, current.shape)
+    
+    # Start from "no change" (clipped to range) as the incumbent
+    best = np.clip(current, SPEC.min, SPEC.max)
+    best_score = sensor_scores(current, best, weights, alpha, beta)
+    
+    for _ in range(levels + 1):
+        candidates = low[:, None, :] + steps * width[:, None, :]
+        scores = sensor_scores(current[:, None, :], candidates, weights, alpha, beta)
+        
+        # Keep the incumbent unless a grid point beats it
+        index = scores.argmax(axis=1)
+        grid_best = np.take_along_axis(candidates, index[:, None, :], axis=1)[:, 0, :]
+        grid_score = np.take_along_axis(scores, index[:, None, :], axis=1)[:, 0, :]
+        improved = grid_score > best_score
+        best = np.where(improved, grid_best, best)
+        best_score = np.where(improved, grid_score, best_score)
+        
+        # Refine: next grid covers one coarse step on each side of the best point
+        step = width / (grid_points - 1)
+        low = np.maximum(best - step, SPEC.min)
+        width = np.minimum(best + step, SPEC.max) - low
+    
+    return best, best_score.sum(axis=-1)
+
+def optimize_scenarios(scenarios, **options):
+    """optimize_recommendations for a list of {sensor: value} dicts; returns a list of dicts and the objectives."""
+    current = np.array([[scenario[s] for s in SPEC.names] for scenario in scenarios], dtype=float)
+    recommended, objective = optimize_recommendations(current, **options)
+    return [dict(zip(SPEC.names, row.tolist())) for row in recommended], objective
@@ -0,0 +1,69 @@
+import numpy as np
+from config import SPEC, ALPHA, BETA
+from satisfaction import batch_satisfaction, batch_energy_cost
+
+def candidate_grid(current_values, points_per_sensor=9):
+    """
+    Dense set of recommended vectors for one reading: every combination of `points_per_sensor`
+    evenly spaced values in each sensor's [min, max] range plus the (clipped) current value.
+    Returns an (n_candidates, n_sensors) array.
+    """
+    current = np.clip(np.asarray(current_values, dtype=float), SPEC.min, SPEC.max)
+    axes = [np.append(np.linspace(spec.min, spec.max, points_per_sensor), current[spec.index])
+            for spec in SPEC.rows]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return np.stack([m.ravel() for m in mesh], axis=-1)
+
+def non_dominated(satisfaction, energy):
+    """
+    Indices of the points not dominated on (satisfaction, energy), both maximised.
+    Sorts by satisfaction (ties by energy) and sweeps once: O(n log n).
+    The front is returned in increasing satisfaction / decreasing energy order.
+    """
+    satisfaction = np.asarray(satisfaction, dtype=float)
+    energy = np.asarray(energy, dtype=float)
+    order = np.lexsort((-energy, -satisfaction))  # best satisfaction first
+    
+    # A point is on the front if its energy beats every point with higher satisfaction
+    sorted_energy = energy[order]
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], sorted_energy[:-1])))
+    front = order[sorted_energy > best_before]
+    return front[::-1]
+
+class ParetoFront:
+    def __init__(self, current_values, points_per_sensor=9, weights=None):
+        """Satisfaction vs. energy trade-off of the recommended values for one reading."""
+        self.current = np.asarray(current_values, dtype=float)
+        weight = SPEC.weight if weights is None else np.array([weights[s] for s in SPEC.names], dtype=float)
+        
+        candidates = candidate_grid(self.current, points_per_sensor)
+        # Satisfaction of the state reached by the recommendation, energy of getting there
+        satisfaction = batch_satisfaction(candidates) @ weight
+        energy = batch_energy_cost(self.current, candidates) @ weight
+        
+        front = non_dominated(satisfaction, energy)
+        self.candidates_evaluated = len(candidates)
+        self.recommended = candidates[front]
+        self.satisfaction = satisfaction[front]
+        self.energy = energy[front]
+    
+    def __len__(self):
+        return len(self.satisfaction)
+    
+    def best_index(self, alpha=ALPHA, beta=BETA):
+        """Position on the front that maximises alpha*satisfaction + beta*energy."""
+        return int((alpha * self.satisfaction + beta * self.energy).argmax())
+    
+    def best(self, alpha=ALPHA, beta=BETA):
+        """Recommended values and objective for a weighting, read from the front."""
+        i = self.best_index(alpha, beta)
+        objective = alpha * self.satisfaction[i] + beta * self.energy[i]
+        return dict(zip(SPEC.names, self.recommended[i].tolist())), float(objective)
+    
+    def sweep(self, alphas):
+        """Best objective for each alpha (beta = 1 - alpha); returns a list of (alpha, recommended, objective)."""
+        return [(alpha,) + self.best(alpha, 1.0 - alpha) for alpha in alphas]
+    
+    def points(self):
+        """List of (satisfaction, energy) pairs along the front."""
+        return list(zip(self.satisfaction.tolist(), self.energy.tolist()))
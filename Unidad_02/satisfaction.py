@@ -1,70 +1,95 @@
+import numpy as np
+from config import SPEC, ALPHA, BETA, SCORE_CACHE_SIZE, SCORE_CACHE_QUANTUM
 
-from config import SENSORS, COSTS
-
-def calculate_satisfaction(sensor, current_value, recommended_value):
-    """Calculate satisfaction level for a single sensor."""
-    config = SENSORS[sensor]
-    min_val = config["min"]
-    max_val = config["max"]
+def _satisfaction(sensor, current_value):
+    """Satisfaction formula (depends only on the current value)."""
+    spec = SPEC.by_name[sensor]
     
-    if config["type"] == "minimization":
-        if current_value <= min_val:
-            return 1.0  # Maximum satisfaction
-        elif current_value >= max_val:
-            return 0.0  # Minimum satisfaction
-        else:
-            # Decreases linearly from min to max
-            return (max_val - current_value) / (max_val - min_val)
+    # Position of the current value inside the sensor's range (0 at min, 1 at max)
+    position = (current_value - spec.min) * spec.inv_range
+    if position <= 0.0:
+        position = 0.0
+    elif position >= 1.0:
+        position = 1.0
     
-    else:  # maximization
-        if current_value >= max_val:
-            return 1.0  # Maximum satisfaction
-        elif current_value <= min_val:
-            return 0.0  # Minimum satisfaction
-        else:
-            # Increases linearly from min to max
-            return (current_value - min_val) / (max_val - min_val)
+    # Minimization: decreases linearly from min to max; maximization: increases
+    return 0.5 + spec.sign * (0.5 - position)
 
-def calculate_energy_cost(sensor, current_value, recommended_value):
-    """Calculate energy cost to move from current to recommended value."""
-    config = SENSORS[sensor]
-    min_val = config["min"]
-    max_val = config["max"]
-    cost_per_unit = COSTS[sensor]
+def _energy_cost(sensor, current_value, recommended_value):
+    """Energy satisfaction formula."""
+    spec = SPEC.by_name[sensor]
     
-    if config["type"] == "minimization":
-        # Energy calculations for minimization type sensors
-        if current_value <= recommended_value:
-            Eo = 0
-        else:
-            Eo = cost_per_unit + cost_per_unit * (current_value - recommended_value)
-        
-        if current_value <= min_val:
-            Emin = 0
-            Emax = 0
-        else:
-            Emin = 0
-            Emax = cost_per_unit + cost_per_unit * (current_value - min_val)
+    # Distance moved in the costly direction (down for minimization, up for maximization)
+    move = spec.sign * (current_value - recommended_value)
+    Eo = spec.cost + spec.cost * move if move > 0 else 0
     
-    else:  # maximization
-        # Energy calculations for maximization type sensors
-        if current_value >= recommended_value:
-            Eo = 0
-        else:
-            Eo = cost_per_unit + cost_per_unit * (recommended_value - current_value)
-        
-        if current_value >= max_val:
-            Emin = 0
-            Emax = 0
-        else:
-            Emax = cost_per_unit + cost_per_unit * (max_val - current_value)
-            Emin = 0
+    # Largest cost: moving all the way to the bound that needs no energy (Emin is always 0)
+    headroom = spec.sign * (current_value - spec.bound)
+    if headroom <= 0:
+        return 1.0  # No energy cost or maximum already achieved
+    Emax = spec.cost + spec.cost * headroom
     
     # Calculate normalized energy satisfaction
-    if Emax == Emin:
-        return 1.0  # No energy cost or maximum already achieved
-    else:
-        return 1.0 - ((Eo - Emin) / (Emax - Emin)) if Emax > Emin else 1.0
+    return 1.0 - Eo / Emax
+
+# Lookup cache: sensor readings and setpoints repeat, so scores of on-grid inputs are memoised
+_satisfaction_table = {}
+_energy_table = {}
+_cache_size = SCORE_CACHE_SIZE
+_quantum = SCORE_CACHE_QUANTUM
+_cache_stats = {"misses": 0, "evictions": 0}
+
+def configure_score_cache(size=SCORE_CACHE_SIZE, quantum=SCORE_CACHE_QUANTUM):
+    """
+    Empty and resize the lookup tables: up to `size` entries per function for inputs that are
+    multiples of `quantum`, evicting the oldest entry when full. Keys are the exact inputs, so
+    cached results are identical to the formulas. size=0 disables the cache.
+    """
+    global _satisfaction_table, _energy_table, _cache_size, _quantum
+    _cache_size = size
+    _quantum = quantum
+    _satisfaction_table = {} if size > 0 else None
+    _energy_table = {} if size > 0 else None
+    for key in _cache_stats:
+        _cache_stats[key] = 0
+
+def score_cache_info():
+    """Table size limit, current entries, and miss/eviction counters (hits are not counted to keep lookups cheap)."""
+    return dict(_cache_stats, size=_cache_size,
+                entries=len(_satisfaction_table or ()) + len(_energy_table or ()))
+
+def _store(table, key, value, *inputs):
+    """Insert a computed score if every input is on the quantum grid (bounded, oldest evicted first)."""
+    _cache_stats["misses"] += 1
+    for x in inputs:
+        if not float(x / _quantum).is_integer():
+            return
+    if len(table) >= _cache_size:
+        del table[next(iter(table))]
+        _cache_stats["evictions"] += 1
+    table[key] = value
+
+def calculate_satisfaction(sensor, current_value, recommended_value):
+    """Calculate satisfaction level for a single sensor."""
+    if _satisfaction_table is None:
+        return _satisfaction(sensor, current_value)
+    key = (sensor, current_value)
+    value = _satisfaction_table.get(key)
+    if value is None:
+        value = _satisfaction(sensor, current_value)
+        _store(_satisfaction_table, key, value, current_value)
+    return value
+
+def calculate_energy_cost(sensor, current_value, recommended_value):
+    """Calculate energy cost to move from current to recommended value."""
+    if _energy_table is None:
+        return _energy_cost(sensor, current_value, recommended_value)
+    key = (sensor, current_value, recommended_value)
+    value = _energy_table.get(key)
+    if value is None:
+        value = _energy_cost(sensor, current_value, recommended_value)
+        _store(_energy_table, key, value, current_value, recommended_value)
+    return value
 
 def calculate_overall_satisfaction(sensor_values, recommended_values, weights):
     """Calculate overall satisfaction based on all sensors and their weights."""
@@ -75,7 +100,7 @@ def calculate_overall_satisfaction(sensor_values, recommended_values, weights):
         recommended = recommended_values[sensor]
         satisfaction = calculate_satisfaction(sensor, current, recommended)
         total_satisfaction += satisfaction * weight
-        
+    
     return total_satisfaction
 
 def calculate_overall_energy_cost(sensor_values, recommended_values, weights):
@@ -87,5 +112,55 @@ def calculate_overall_energy_cost(sensor_values, recommended_values, weights):
         recommended = recommended_values[sensor]
         energy_satisfaction = calculate_energy_cost(sensor, current, recommended)
         total_energy_satisfaction += energy_satisfaction * weight
-        
+    
     return total_energy_satisfaction
+
+# Batch evaluation: the same formulas over (n_scenarios, n_sensors) arrays
+
+# Column order of the (n_scenarios, n_sensors) arrays used by the batch API
+SENSOR_ORDER = SPEC.names
+
+def to_array(values_list):
+    """Convert a list of {sensor: value} dicts to an (n_scenarios, n_sensors) array."""
+    return np.array([[values[s] for s in SENSOR_ORDER] for values in values_list], dtype=float)
+
+def batch_satisfaction(current_values):
+    """Per-sensor satisfaction for an (n_scenarios, n_sensors) array of current values."""
+    current = np.asarray(current_values, dtype=float)
+    position = np.clip((current - SPEC.min) * SPEC.inv_range, 0.0, 1.0)
+    # Minimization: 1 - position; maximization: position
+    return 0.5 + SPEC.sign * (0.5 - position)
+
+def batch_energy_cost(current_values, recommended_values):
+    """Per-sensor energy satisfaction for (n_scenarios, n_sensors) current/recommended arrays."""
+    current = np.asarray(current_values, dtype=float)
+    recommended = np.asarray(recommended_values, dtype=float)
+    
+    # Distance moved in the costly direction (down for minimization, up for maximization)
+    move = SPEC.sign * (current - recommended)
+    Eo = np.where(move > 0, SPEC.cost + SPEC.cost * move, 0.0)
+    headroom = SPEC.sign * (current - SPEC.bound)
+    Emax = np.where(headroom > 0, SPEC.cost + SPEC.cost * headroom, 0.0)
+    
+    # Emin is always 0; with no energy range the satisfaction is 1
+    has_range = Emax > 0
+    return np.where(has_range, 1.0 - Eo / np.where(has_range, Emax, 1.0), 1.0)
+
+def evaluate_batch(current_values, recommended_values, weights=None, alpha=ALPHA, beta=BETA):
+    """
+    Score many scenarios at once. Returns a dict of arrays: per-sensor "satisfaction" and
+    "energy" (n_scenarios, n_sensors), and weighted "overall_satisfaction",
+    "overall_energy" and "objective" (n_scenarios,).
+    """
+    weight = SPEC.weight if weights is None else np.array([weights[s] for s in SENSOR_ORDER], dtype=float)
+    satisfaction = batch_satisfaction(current_values)
+    energy = batch_energy_cost(current_values, recommended_values)
+    overall_satisfaction = satisfaction @ weight
+    overall_energy = energy @ weight
+    return {
+        "satisfaction": satisfaction,
+        "energy": energy,
+        "overall_satisfaction": overall_satisfaction,
+        "overall_energy": overall_energy,
+        "objective": alpha * overall_satisfaction + beta * overall_energy,
+    }
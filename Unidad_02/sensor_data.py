@@ -1,18 +1,16 @@
 
 import random
 import numpy as np
-from config import SENSORS
+from config import SPEC
 
 def generate_sensor_values(num_readings=30):
     """Generate random sensor readings within the configured ranges."""
     data = {}
-    for sensor, config in SENSORS.items():
-        min_val = config["min"]
-        max_val = config["max"]
+    for spec in SPEC.rows:
         # Generate random values within range, possibly exceeding slightly
-        extended_min = min_val * 0.7
-        extended_max = max_val * 1.3
-        data[sensor] = [random.uniform(extended_min, extended_max) for _ in range(num_readings)]
+        extended_min = spec.min * 0.7
+        extended_max = spec.max * 1.3
+        data[spec.name] = [random.uniform(extended_min, extended_max) for _ in range(num_readings)]
     
     return data
 
@@ -31,9 +29,8 @@ def get_test_scenarios():
     # Generate test scenarios with values inside and outside ranges
     for _ in range(5):
         scenario = {}
-        for sensor, config in SENSORS.items():
-            min_val = config["min"]
-            max_val = config["max"]
+        for spec in SPEC.rows:
+            sensor, min_val, max_val = spec.name, spec.min, spec.max
             range_width = max_val - min_val
             
             # 50% chance to be inside range, 50% outside
@@ -1,6 +1,7 @@
 import random
 import numpy as np
 import matplotlib.pyplot as plt
+from config import SensorSpecTable
 
 # =========================================================================
 # CONFIGURATION PARAMETERS
@@ -35,6 +36,9 @@ ALPHA = 0.3  # Satisfaction weight
 BETA = 0.7   # Energy weight
 CORRECTION_COEFFICIENT = 0.2  # "x" in the algorithm
 
+# Compiled once: read-only columns and per-sensor rows used by all calculations
+SPEC = SensorSpecTable(SENSORS, COSTS, WEIGHTS)
+
 # =========================================================================
 # SENSOR DATA PROCESSING FUNCTIONS
 # =========================================================================
@@ -42,13 +46,11 @@ CORRECTION_COEFFICIENT = 0.2  # "x" in the algorithm
 def generate_sensor_values(num_readings=30):
     """Generate random sensor readings within the configured ranges."""
     data = {}
-    for sensor, config in SENSORS.items():
-        min_val = config["min"]
-        max_val = config["max"]
+    for spec in SPEC.rows:
         # Generate random values within range, possibly exceeding slightly
-        extended_min = min_val * 0.7
-        extended_max = max_val * 1.3
-        data[sensor] = [random.uniform(extended_min, extended_max) for _ in range(num_readings)]
+        extended_min = spec.min * 0.7
+        extended_max = spec.max * 1.3
+        data[spec.name] = [random.uniform(extended_min, extended_max) for _ in range(num_readings)]
     
     return data
 
@@ -67,9 +69,8 @@ def get_test_scenarios():
     # Generate test scenarios with values inside and outside ranges
     for _ in range(5):
         scenario = {}
-        for sensor, config in SENSORS.items():
-            min_val = config["min"]
-            max_val = config["max"]
+        for spec in SPEC.rows:
+            sensor, min_val, max_val = spec.name, spec.min, spec.max
             range_width = max_val - min_val
             
             # 50% chance to be inside range, 50% outside
@@ -92,68 +93,34 @@ def get_test_scenarios():
 
 def calculate_satisfaction(sensor, current_value, recommended_value):
     """Calculate satisfaction level for a single sensor."""
-    config = SENSORS[sensor]
-    min_val = config["min"]
-    max_val = config["max"]
-    
-    if config["type"] == "minimization":
-        if current_value <= min_val:
-            return 1.0  # Maximum satisfaction
-        elif current_value >= max_val:
-            return 0.0  # Minimum satisfaction
-        else:
-            # Decreases linearly from min to max
-            return (max_val - current_value) / (max_val - min_val)
-    
-    else:  # maximization
-        if current_value >= max_val:
-            return 1.0  # Maximum satisfaction
-        elif current_value <= min_val:
-            return 0.0  # Minimum satisfaction
-        else:
-            # Increases linearly from min to max
-            return (current_value - min_val) / (max_val - min_val)
+    spec = SPEC.by_name[sensor]
+    
+    # Position of the current value inside the sensor's range (0 at min, 1 at max)
+    position = (current_value - spec.min) * spec.inv_range
+    if position <= 0.0:
+        position = 0.0
+    elif position >= 1.0:
+        position = 1.0
+    
+    # Minimization: decreases linearly from min to max; maximization: increases
+    return 0.5 + spec.sign * (0.5 - position)
 
 def calculate_energy_cost(sensor, current_value, recommended_value):
     """Calculate energy cost to move from current to recommended value."""
-    config = SENSORS[sensor]
-    min_val = config["min"]
-    max_val = config["max"]
-    cost_per_unit = COSTS[sensor]
-    
-    if config["type"] == "minimization":
-        # Energy calculations for minimization type sensors
-        if current_value <= recommended_value:
-            Eo = 0
-        else:
-            Eo = cost_per_unit + cost_per_unit * (current_value - recommended_value)
-        
-        if current_value <= min_val:
-            Emin = 0
-            Emax = 0
-        else:
-            Emin = 0
-            Emax = cost_per_unit + cost_per_unit * (current_value - min_val)
+    spec = SPEC.by_name[sensor]
     
-    else:  # maximization
-        # Energy calculations for maximization type sensors
-        if current_value >= recommended_value:
-            Eo = 0
-        else:
-            Eo = cost_per_unit + cost_per_unit * (recommended_value - current_value)
-        
-        if current_value >= max_val:
-            Emin = 0
-            Emax = 0
-        else:
-            Emax = cost_per_unit + cost_per_unit * (max_val - current_value)
-            Emin = 0
+    # Distance moved in the costly direction (down for minimization, up for maximization)
+    move = spec.sign * (current_value - recommended_value)
+    Eo = spec.cost + spec.cost * move if move > 0 else 0
     
-    # Calculate normalized energy satisfaction
-    if Emax == Emin:
+    # Largest cost: moving all the way to the bound that needs no energy (Emin is always 0)
+    headroom = spec.sign * (current_value - spec.bound)
+    if headroom <= 0:
         return 1.0  # No energy cost or maximum already achieved
-    else:
-        return 1.0 - ((Eo - Emin) / (Emax - Emin)) if Emax > Emin else 1.0
+    Emax = spec.cost + spec.cost * headroom
+    
+    # Calculate normalized energy satisfaction
+    return 1.0 - Eo / Emax
 
 def calculate_overall_satisfaction(sensor_values, recommended_values, weights):
     """Calculate overall satisfaction based on all sensors and their weights."""
@@ -338,12 +305,12 @@ def evaluate_scenarios():
     for scenario in scenarios:
         rec_values = {}
         for sensor, value in scenario.items():
-            config = SENSORS[sensor]
+            spec = SPEC.by_name[sensor]
             # Generate a recommended value within sensor's min-max range
             rec_values[sensor] = np.clip(
                 value * np.random.uniform(0.85, 1.15),  # Vary by +/- 15%
-                config["min"],
-                config["max"]
+                spec.min,
+                spec.max
             )
         recommended_values.append(rec_values)
     
@@ -49,3 +49,22 @@ def plot_satisfaction_levels(satisfaction_data, title="Satisfaction Levels"):
     plt.tight_layout()
     plt.savefig(f"/home/lara5tar/Escritorio/SE_PORTAFOLIO-DE-EVIDENCIAS_2025-_1-_EQ6/Unidad_02/{title.replace(' ', '_')}.png")
     plt.show()
+
+def plot_pareto_front(front, weightings=(), title="Satisfaction vs Energy Pareto Front"):
+    """Plot a ParetoFront and mark the best recommendation for each (alpha, beta) weighting."""
+    plt.figure(figsize=(10, 6))
+    plt.plot(front.satisfaction, front.energy, 'o-', label='Pareto front', markersize=3)
+    
+    for alpha, beta in weightings:
+        i = front.best_index(alpha, beta)
+        plt.plot(front.satisfaction[i], front.energy[i], 's', markersize=8, label=f'α={alpha}, β={beta}')
+    
+    plt.xlabel('Satisfaction')
+    plt.ylabel('Energy Cost Satisfaction')
+    plt.title(title)
+    plt.legend()
+    plt.grid(True, linestyle='--', alpha=0.7)
+    
+    plt.tight_layout()
+    plt.savefig(f"/home/lara5tar/Escritorio/SE_PORTAFOLIO-DE-EVIDENCIAS_2025-_1-_EQ6/Unidad_02/{title.replace(' ', '_')}.png")
+    plt.show()
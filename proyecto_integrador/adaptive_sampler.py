@@ -0,0 +1,85 @@
+"""
+Planificación adaptativa del intervalo de muestreo del controlador
+Alarga el intervalo mientras el error se mantiene estable y vuelve al intervalo mínimo
+en cuanto el error salta
+Usa solo bibliotecas estándar de Python
+"""
+
+
+class AdaptiveSampler:
+    def __init__(self, min_interval, max_interval, growth=2.0, stable_ticks=3,
+                 error_tolerance=0.02, output_tolerance=None, jump_threshold=0.05):
+        """
+        min_interval / max_interval: límites del intervalo en segundos
+        growth: factor con el que crece el intervalo tras stable_ticks ciclos estables
+        error_tolerance: cambio máximo del error entre ciclos para considerarlos estables
+        output_tolerance: si se indica, la salida tampoco debe cambiar más que esto. Por defecto
+        no se exige: la exploración del recocido mueve la salida aunque la planta esté estable,
+        y si ese movimiento afecta a la planta ya se refleja en el error
+        jump_threshold: cambio del error que se considera una perturbación
+        """
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Se requiere 0 < min_interval <= max_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.growth = growth
+        self.stable_ticks = stable_ticks
+        self.error_tolerance = error_tolerance
+        self.output_tolerance = output_tolerance
+        self.jump_threshold = jump_threshold
+
+        self.interval = min_interval
+        self.previous_error = None
+        self.previous_output = None
+        self.stable = 0
+
+        self.samples = 0
+        self.total_interval = 0.0
+        self.resets = 0
+
+    def is_disturbance(self, error):
+        """Indica si el error cambió lo suficiente como para volver al muestreo rápido"""
+        return self.previous_error is not None and abs(error - self.previous_error) > self.jump_threshold
+
+    def is_stable(self):
+        """Indica si la planta lleva al menos stable_ticks ciclos estables (muestreo lento)"""
+        return self.stable >= self.stable_ticks
+
+    def reset(self):
+        """Vuelve al intervalo mínimo"""
+        if self.interval > self.min_interval:
+            self.resets += 1
+        self.interval = self.min_interval
+        self.stable = 0
+
+    def update(self, error, output):
+        """Registra el resultado de un ciclo y devuelve el intervalo hasta el siguiente"""
+        if self.is_disturbance(error):
+            self.reset()
+        elif (self.previous_error is not None
+              and abs(error - self.previous_error) <= self.error_tolerance
+              and (self.output_tolerance is None
+                   or abs(output - self.previous_output) <= self.output_tolerance)):
+            self.stable += 1
+            if self.stable >= self.stable_ticks:
+                self.interval = min(self.max_interval, self.interval * self.growth)
+        else:
+            # El error sigue cambiando (o la salida, si se exige): mantener el muestreo rápido
+            self.reset()
+
+        self.previous_error = error
+        self.previous_output = output
+        self.samples += 1
+        self.total_interval += self.interval
+        return self.interval
+
+    def average_interval(self):
+        return self.total_interval / self.samples if self.samples else self.min_interval
+
+    def stats(self):
+        return {
+            "samples": self.samples,
+            "interval": self.interval,
+            "avg_interval": self.average_interval(),
+            "resets": self.resets,
+        }
@@ -0,0 +1,115 @@
+"""
+Interruptor de circuito (circuit breaker) para las llamadas a Firebase
+Se abre tras varias fallas o respuestas lentas seguidas; mientras está abierto las llamadas
+se rechazan sin tocar la red y, pasado un tiempo, se permiten sondas para volver a cerrarlo
+Usa solo bibliotecas estándar de Python
+"""
+
+import time
+import threading
+
+from control_logging import get_logger, fields
+
+logger = get_logger("circuito")
+
+CLOSED = "cerrado"
+OPEN = "abierto"
+HALF_OPEN = "semiabierto"
+
+
+class CircuitOpenError(ConnectionError):
+    """La llamada se rechazó porque el circuito está abierto"""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=3, slow_call_threshold=None, reset_timeout=10.0,
+                 half_open_successes=2, clock=time.monotonic):
+        """
+        failure_threshold: fallas (o llamadas lentas) consecutivas que abren el circuito
+        slow_call_threshold: segundos a partir de los cuales una respuesta cuenta como falla
+        reset_timeout: segundos abierto antes de permitir sondas
+        half_open_successes: sondas exitosas seguidas necesarias para cerrarlo
+        """
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_successes = half_open_successes
+        self.clock = clock
+
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self._probe_successes = 0
+        self._opened_at = 0.0
+
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self):
+        """Indica si se puede intentar una llamada (en semiabierto, una sonda a la vez)"""
+        with self._lock:
+            if self.state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+                self._probe_successes = 0
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, duration, ok):
+        """Registra el resultado de una llamada permitida por allow()"""
+        slow = self.slow_call_threshold is not None and duration > self.slow_call_threshold
+        with self._lock:
+            if ok and not slow:
+                if self.state == HALF_OPEN:
+                    self._probe_in_flight = False
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_successes:
+                        self.state = CLOSED
+                        self._consecutive_failures = 0
+                        logger.info("Circuito cerrado; Firebase responde de nuevo")
+                else:
+                    self._consecutive_failures = 0
+                return
+
+            if self.state == HALF_OPEN:
+                self._open()
+                return
+            self._consecutive_failures += 1
+            if self.state == CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def request(self, pool, method, path, body=None, headers=None):
+        """
+        Petición a un FirebaseConnectionPool protegida por el interruptor; devuelve (estado, cuerpo).
+        Lanza CircuitOpenError sin tocar la red si el circuito está abierto.
+        """
+        if not self.allow():
+            raise CircuitOpenError("Circuito abierto: Firebase no disponible")
+        start = self.clock()
+        try:
+            status, data = pool.request(method, path, body=body, headers=headers)
+        except Exception:
+            self.record(self.clock() - start, False)
+            raise
+        # Los errores 5xx indican un problema del servidor; los 4xx son de la petición
+        self.record(self.clock() - start, status < 500)
+        return status, data
+
+    def _open(self):
+        """Abre el circuito (llamar con el lock tomado)"""
+        self.state = OPEN
+        self._opened_at = self.clock()
+        self._probe_in_flight = False
+        self.opens += 1
+        logger.warning("Circuito abierto; se usarán valores de respaldo", extra=fields(
+            failures=self._consecutive_failures, retry_in=self.reset_timeout))
+
+    def stats(self):
+        with self._lock:
+            return {"state": self.state, "opens": self.opens, "rejected": self.rejected}
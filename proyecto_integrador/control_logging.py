@@ -0,0 +1,141 @@
+"""
+Registro estructurado y no bloqueante para el bucle de control
+Los mensajes se encolan en el hilo que los emite y un hilo de fondo los formatea y escribe;
+los mensajes repetidos se limitan por intervalo para no inundar la consola
+Usa solo bibliotecas estándar de Python
+"""
+
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import contextlib
+import logging.handlers
+
+LOGGER_NAME = "proyecto_integrador"
+
+
+def get_logger(name=None):
+    """Logger del proyecto o uno de sus hijos (por ejemplo 'firebase')"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+def fields(**values):
+    """Campos estructurados para el argumento extra: logger.info(msg, extra=fields(error=0.1))"""
+    return {"fields": values}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formato 'fecha nivel logger mensaje clave=valor ...'"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        extra = getattr(record, "fields", None)
+        if extra:
+            line += " " + " ".join(f"{key}={self._value(value)}" for key, value in extra.items())
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            line += f" suprimidos={suppressed}"
+        return line
+
+    @staticmethod
+    def _value(value):
+        if isinstance(value, float):
+            return f"{value:.4g}"
+        return str(value)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Deja pasar cada mensaje (por logger y plantilla) como mucho una vez por intervalo.
+    Los mensajes descartados se cuentan y se informan en el siguiente que pase.
+    Los errores y críticos nunca se descartan.
+    """
+
+    def __init__(self, interval=5.0, max_level=logging.WARNING):
+        super().__init__()
+        self.interval = interval
+        self.max_level = max_level
+        self._last = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.interval <= 0 or record.levelno > self.max_level:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last[key] = now
+            record.suppressed = self._suppressed.pop(key, 0)
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que no formatea en el hilo que emite: el formato se hace en el hilo de fondo"""
+
+    def prepare(self, record):
+        return record
+
+
+_listener = None
+_handler = None
+
+
+def configure_logging(level=logging.INFO, stream=None, rate_limit_interval=5.0):
+    """
+    Activa el registro en consola a través de una cola y un hilo de fondo.
+    Se puede llamar varias veces; la última configuración reemplaza a la anterior.
+    """
+    global _listener, _handler
+    shutdown_logging()
+
+    log_queue = queue.SimpleQueue()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(StructuredFormatter())
+
+    _handler = _DeferredQueueHandler(log_queue)
+    _handler.addFilter(RateLimitFilter(rate_limit_interval))
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+    logger = get_logger()
+    logger.addHandler(_handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+def shutdown_logging():
+    """Vacía la cola pendiente y detiene el hilo de fondo"""
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        get_logger().removeHandler(_handler)
+        _handler = None
+
+
+@contextlib.contextmanager
+def quiet_logging(level=logging.WARNING):
+    """Sube temporalmente el nivel del logger del proyecto (reproducciones y benchmarks)"""
+    logger = get_logger()
+    previous = logger.level
+    logger.setLevel(level)
+    try:
+        yield
+    finally:
+        logger.setLevel(previous)
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,258 @@
+"""
+Servidor local que imita la API REST de Firebase para pruebas sin conexión
+Implementa GET (con orderBy/limitToLast/limitToFirst/startAt/endAt), PUT, PATCH y el streaming
+de eventos (text/event-stream) sobre un árbol JSON en memoria, con latencia y fallos inyectables
+Usa solo bibliotecas estándar de Python
+"""
+
+import copy
+import json
+import time
+import queue
+import random
+import threading
+import http.server
+import urllib.parse
+
+
+def _split_path(path):
+    """Convierte "/sensores/abc.json" en ["sensores", "abc"]"""
+    path = urllib.parse.unquote(path)
+    if path.endswith(".json"):
+        path = path[:-5]
+    return [p for p in path.split("/") if p]
+
+
+def apply_query(data, query):
+    """Aplica orderBy/limitToLast de Firebase sobre un nodo del árbol"""
+    if not isinstance(data, dict):
+        return data
+    params = urllib.parse.parse_qs(query)
+    order_by = params.get("orderBy", [None])[0]
+    if order_by is None:
+        return data
+    field = json.loads(order_by)
+    items = [(k, v) for k, v in data.items() if isinstance(v, dict) and field in v]
+    items.sort(key=lambda item: (item[1][field], item[0]))
+    if "startAt" in params:
+        start_at = json.loads(params["startAt"][0])
+        items = [item for item in items if item[1][field] >= start_at]
+    if "endAt" in params:
+        end_at = json.loads(params["endAt"][0])
+        items = [item for item in items if item[1][field] <= end_at]
+    if "limitToFirst" in params:
+        items = items[:int(params["limitToFirst"][0])]
+    if "limitToLast" in params:
+        items = items[-int(params["limitToLast"][0]):]
+    return dict(items)
+
+
+class LocalFirebaseServer:
+    def __init__(self, host="127.0.0.1", port=0, keepalive_interval=30.0,
+                 latency=0.0, latency_jitter=0.0, failure_rate=0.0, seed=None):
+        self.data = {}
+        self.keepalive_interval = keepalive_interval
+        # Condiciones de red simuladas para las peticiones REST
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._subscribers = []  # (ruta como lista, cola de eventos)
+
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Encabezados y cuerpo se escriben por separado; sin Nagle no hay espera de ACK retrasado
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parsed = urllib.parse.urlsplit(self.path)
+                parts = _split_path(parsed.path)
+                if "text/event-stream" in self.headers.get("Accept", ""):
+                    server._serve_stream(self, parts, parsed.query)
+                else:
+                    server._serve_rest(self, "GET", parts, parsed.query)
+
+            def do_PUT(self):
+                parsed = urllib.parse.urlsplit(self.path)
+                server._serve_rest(self, "PUT", _split_path(parsed.path), parsed.query)
+
+            def do_PATCH(self):
+                parsed = urllib.parse.urlsplit(self.path)
+                server._serve_rest(self, "PATCH", _split_path(parsed.path), parsed.query)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """Arranca el servidor en un hilo en segundo plano"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="firebase-local", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Detiene el servidor y cierra los streams abiertos"""
+        with self._lock:
+            for _, events in self._subscribers:
+                events.put(None)
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _get_node(self, parts):
+        """Devuelve el nodo en la ruta indicada (llamar con el lock tomado)"""
+        node = self.data
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def _write(self, parts, value, merge):
+        """Escribe (o fusiona) un valor en la ruta y notifica a los suscriptores"""
+        with self._lock:
+            if not parts:
+                if merge:
+                    self.data.update(value)
+                else:
+                    self.data = value if isinstance(value, dict) else {}
+            else:
+                node = self.data
+                for part in parts[:-1]:
+                    child = node.get(part)
+                    if not isinstance(child, dict):
+                        child = node[part] = {}
+                    node = child
+                if value is None:
+                    node.pop(parts[-1], None)
+                elif merge and isinstance(node.get(parts[-1]), dict):
+                    node[parts[-1]].update(value)
+                else:
+                    node[parts[-1]] = value
+
+            event = "patch" if merge else "put"
+            for sub_parts, events in self._subscribers:
+                if parts[:len(sub_parts)] == sub_parts:
+                    relative = "/" + "/".join(parts[len(sub_parts):])
+                    events.put((event, {"path": relative, "data": copy.deepcopy(value)}))
+                elif sub_parts[:len(parts)] == parts:
+                    # Se reescribió un nodo que contiene la ruta suscrita
+                    events.put(("put", {"path": "/", "data": copy.deepcopy(self._get_node(sub_parts))}))
+
+    def set(self, path, value):
+        """Equivalente a un PUT: reemplaza el valor en la ruta"""
+        self._write(_split_path(path), value, merge=False)
+
+    def update(self, path, values):
+        """Equivalente a un PATCH: fusiona los campos en la ruta"""
+        self._write(_split_path(path), values, merge=True)
+
+    def get(self, path, query=""):
+        """Equivalente a un GET: devuelve una copia del nodo con la consulta aplicada"""
+        with self._lock:
+            return copy.deepcopy(apply_query(self._get_node(_split_path(path)), query))
+
+    def _serve_rest(self, handler, method, parts, query):
+        """Atiende GET/PUT/PATCH aplicando la latencia y la tasa de fallos configuradas"""
+        length = int(handler.headers.get("Content-Length", 0))
+        body = handler.rfile.read(length) if length else b""
+
+        delay = self.latency + (self.rng.uniform(0, self.latency_jitter) if self.latency_jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        self.requests_served += 1
+
+        if self.failure_rate and self.rng.random() < self.failure_rate:
+            status, result = 503, {"error": "fallo simulado"}
+        else:
+            try:
+                if method == "GET":
+                    with self._lock:
+                        result = copy.deepcopy(apply_query(self._get_node(parts), query))
+                else:
+                    result = json.loads(body.decode("utf-8")) if body else None
+                    if method == "PATCH" and not isinstance(result, dict):
+                        raise ValueError("PATCH requiere un objeto JSON")
+                    if method == "PATCH":
+                        # PATCH multi-ruta: cada clave es una ruta relativa que se reemplaza
+                        for path, value in result.items():
+                            self._write(parts + _split_path(path), value, merge=False)
+                    else:
+                        self._write(parts, result, merge=False)
+                status = 200
+            except ValueError as e:
+                status, result = 400, {"error": str(e)}
+
+        payload = json.dumps(result).encode("utf-8")
+        try:
+            handler.send_response(status)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(payload)))
+            handler.end_headers()
+            handler.wfile.write(payload)
+            handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente se desconectó (p. ej. por su timeout durante la latencia simulada)
+            handler.close_connection = True
+
+    def _serve_stream(self, handler, parts, query):
+        """Envía la instantánea inicial y después cada cambio como evento SSE"""
+        events = queue.Queue()
+        with self._lock:
+            snapshot = copy.deepcopy(apply_query(self._get_node(parts), query))
+            self._subscribers.append((parts, events))
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Cache-Control", "no-cache")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        handler.close_connection = True
+
+        def send(event, payload):
+            handler.wfile.write(f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode("utf-8"))
+            handler.wfile.flush()
+
+        try:
+            send("put", {"path": "/", "data": snapshot})
+            while True:
+                try:
+                    item = events.get(timeout=self.keepalive_interval)
+                except queue.Empty:
+                    send("keep-alive", None)
+                    continue
+                if item is None:
+                    break
+                send(*item)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self._lock:
+                self._subscribers.remove((parts, events))
+
+
+if __name__ == "__main__":
+    # Servidor de prueba que publica lecturas simuladas del LDR cada segundo
+    server = LocalFirebaseServer(port=8765).start()
+    print(f"Servidor local de Firebase en {server.url}")
+    try:
+        while True:
+            timestamp = int(time.time())
+            server.set(f"sensores/{timestamp}", {
+                "timestamp": timestamp,
+                "ldr_value": random.randint(300, 800),
+            })
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
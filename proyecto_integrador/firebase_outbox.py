@@ -0,0 +1,207 @@
+"""
+Bandeja de salida persistente (outbox) para las escrituras hacia Firebase
+Cada escritura se anexa a un diario en disco y regresa de inmediato; un hilo de fondo
+envía el diario a Firebase por lotes con reintentos y espera exponencial
+Usa solo bibliotecas estándar de Python
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from collections import deque
+from itertools import islice
+
+from control_logging import get_logger, fields
+
+logger = get_logger("outbox")
+
+OUTBOX_JOURNAL = 'firebase_outbox.journal'
+
+
+class DurableOutbox:
+    def __init__(self, patch_fn, path=OUTBOX_JOURNAL, batch_size=50, base_delay=0.5, max_delay=60.0,
+                 fsync_interval=1.0, compact_bytes=1024 * 1024):
+        """
+        patch_fn(path, data) envía un PATCH multi-ruta a Firebase y devuelve True si tuvo éxito.
+        Las rutas de Firebase actúan como claves idempotentes: reenviar un lote después de
+        una caída escribe los mismos valores en las mismas rutas.
+        """
+        self.patch_fn = patch_fn
+        self.path = path
+        self.ack_path = path + '.ack'
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.fsync_interval = fsync_interval
+        self.compact_bytes = compact_bytes
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._abort = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._last_fsync = time.monotonic()
+
+        self.acked_seq = self._load_ack()
+        self._next_seq = self.acked_seq + 1
+        self._recover()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+        self.enqueued = 0
+        self.sent = 0
+        self.batches = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+
+    def _load_ack(self):
+        """Último número de secuencia confirmado por Firebase (0 si no hay)"""
+        try:
+            with open(self.ack_path) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _save_ack(self, seq):
+        """Guarda la confirmación de forma atómica (llamar con el lock tomado)"""
+        tmp_path = self.ack_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(seq))
+        os.replace(tmp_path, self.ack_path)
+        self.acked_seq = seq
+
+    def _recover(self):
+        """Recarga las entradas del diario aún no confirmadas (tras una caída o un reinicio)"""
+        if not os.path.exists(self.path):
+            return
+        complete = 0
+        with open(self.path, 'rb+') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Línea incompleta por una interrupción durante la escritura: se recorta
+                    # para que la siguiente entrada no quede pegada a ella
+                    f.truncate(complete)
+                    break
+                complete += len(line)
+                try:
+                    seq, path, data = json.loads(line)
+                except ValueError:
+                    continue
+                if seq > self.acked_seq:
+                    self._pending.append((seq, path, data))
+                self._next_seq = max(self._next_seq, seq + 1)
+        if self._pending:
+            logger.info("Entradas pendientes recuperadas del diario", extra=fields(pending=len(self._pending)))
+
+    def enqueue(self, path, data):
+        """Anexa una escritura al diario y regresa sin esperar a la red"""
+        with self._cond:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._file.write(json.dumps([seq, path, data]) + "\n")
+            self._file.flush()
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+            self._pending.append((seq, path, data))
+            self.enqueued += 1
+            self._cond.notify()
+        return True
+
+    def patch(self, path, updates):
+        """Misma firma que firebase_patch: encola cada ruta del PATCH multi-ruta"""
+        prefix = path.strip("/")
+        for key, data in updates.items():
+            self.enqueue(f"{prefix}/{key}" if prefix else key, data)
+        return True
+
+    def start(self):
+        """Inicia el hilo que vacía el diario hacia Firebase"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._abort.clear()
+        self._thread = threading.Thread(target=self._run, name="firebase-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Intenta enviar lo pendiente durante timeout segundos y detiene el hilo.
+        Lo que no se haya enviado permanece en el diario para la siguiente ejecución.
+        """
+        if self._thread is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify_all()
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self._abort.set()
+                self._thread.join(self.max_delay)
+            self._thread = None
+        with self._cond:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+    def wait_empty(self, timeout=None):
+        """Espera a que no queden entradas pendientes; devuelve True si se vació"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopping)
+                if not self._pending or self._abort.is_set():
+                    return
+                batch = list(islice(self._pending, self.batch_size))
+
+            # Las entradas posteriores de la misma ruta sustituyen a las anteriores
+            updates = {path: data for _, path, data in batch}
+            try:
+                ok = self.patch_fn("", updates)
+            except Exception as e:
+                logger.warning("Error enviando lote del diario: %s", e)
+                ok = False
+
+            if ok:
+                with self._cond:
+                    for _ in batch:
+                        self._pending.popleft()
+                    self._save_ack(batch[-1][0])
+                    self.sent += len(batch)
+                    self.batches += 1
+                    self.consecutive_failures = 0
+                    if not self._pending:
+                        self._compact()
+                    self._cond.notify_all()
+                continue
+
+            self.failures += 1
+            self.consecutive_failures += 1
+            delay = min(self.max_delay, self.base_delay * 2 ** (self.consecutive_failures - 1))
+            delay *= random.uniform(0.5, 1.0)
+            logger.warning("Firebase no disponible; reintento del diario", extra=fields(
+                pending=len(self._pending), retry_in=delay))
+            if self._abort.wait(delay):
+                return
+
+    def _compact(self):
+        """Vacía el diario cuando todo está confirmado y supera compact_bytes (llamar con el lock tomado)"""
+        if self._file.tell() < self.compact_bytes:
+            return
+        self._file.close()
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def stats(self):
+        with self._cond:
+            return {
+                "enqueued": self.enqueued,
+                "sent": self.sent,
+                "batches": self.batches,
+                "pending": len(self._pending),
+                "failures": self.failures,
+            }
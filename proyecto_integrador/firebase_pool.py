@@ -0,0 +1,241 @@
+"""
+Pool de conexiones HTTP/1.1 persistentes (keep-alive) hacia Firebase
+Reutiliza conexiones TCP+TLS entre peticiones para evitar un handshake por cada lectura o escritura
+Usa solo bibliotecas estándar de Python
+"""
+
+import time
+import heapq
+import socket
+import threading
+import http.client
+import urllib.parse
+from collections import deque
+
+# Errores que indican que el servidor cerró una conexión reutilizada
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    http.client.CannotSendRequest,
+    http.client.ResponseNotReady,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class _DeadlineWatchdog:
+    """Hilo compartido que vence los plazos de las peticiones en curso (un montículo por fecha)"""
+
+    def __init__(self):
+        self._heap = []
+        self._order = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def schedule(self, deadline):
+        with self._cond:
+            self._order += 1
+            heapq.heappush(self._heap, (deadline.expires, self._order, deadline))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="firebase-deadlines", daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is deadline:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, deadline = heapq.heappop(self._heap)
+            deadline.expire()
+
+
+_watchdog = _DeadlineWatchdog()
+
+
+class _RequestDeadline:
+    """
+    Plazo total de una petición. El timeout del socket solo limita cada operación
+    (un servidor que envía byte a byte lo renueva en cada recv), así que al vencer
+    el plazo se cierra el socket de la conexión en curso.
+    """
+
+    def __init__(self, timeout):
+        self.expires = time.monotonic() + timeout
+        self.expired = False
+        self._connection = None
+        self._done = False
+        self._lock = threading.Lock()
+        _watchdog.schedule(self)
+
+    def remaining(self):
+        """Segundos que quedan; lanza TimeoutError si el plazo ya venció"""
+        remaining = self.expires - time.monotonic()
+        if remaining <= 0 or self.expired:
+            raise TimeoutError("La petición superó su plazo")
+        return remaining
+
+    def watch(self, connection):
+        """Conexión cuyo socket se cierra si vence el plazo"""
+        with self._lock:
+            self._connection = connection
+
+    def expire(self):
+        with self._lock:
+            if self._done:
+                return
+            self.expired = True
+            sock = self._connection.sock if self._connection is not None else None
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def cancel(self):
+        """La petición terminó: el vencimiento posterior ya no hace nada"""
+        with self._lock:
+            self._done = True
+            self._connection = None
+
+
+class FirebaseConnectionPool:
+    def __init__(self, base_url, max_connections=4, idle_timeout=30.0, timeout=None):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.scheme = parsed.scheme or "https"
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip("/")
+
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+
+        # Conexiones libres como (conexión, último uso); se reutiliza la más reciente
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+        # Contadores para diagnóstico
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.reconnects = 0
+
+    def _new_connection(self, timeout=None):
+        """Abre una conexión nueva hacia el host de Firebase"""
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.connections_opened += 1
+        return connection_class(self.host, self.port, timeout=timeout if timeout is not None else self.timeout)
+
+    def _evict_idle(self, now):
+        """Cierra las conexiones que llevan más de idle_timeout sin usarse (llamar con el lock tomado)"""
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            connection, _ = self._idle.popleft()
+            connection.close()
+
+    def _acquire(self, deadline=None):
+        """Obtiene una conexión libre del pool o abre una nueva (la espera cuenta contra el plazo)"""
+        # Con plazo, una petición colgada no bloquea indefinidamente a las demás
+        if not self._slots.acquire(timeout=deadline.remaining() if deadline is not None else None):
+            raise TimeoutError("Sin conexiones libres en el pool")
+        try:
+            timeout = deadline.remaining() if deadline is not None else None
+        except TimeoutError:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            if self._idle:
+                connection, _ = self._idle.pop()
+                self.connections_reused += 1
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+        return self._new_connection(timeout), False
+
+    def _release(self, connection, reusable):
+        """Devuelve la conexión al pool o la cierra si no se puede reutilizar"""
+        try:
+            if reusable:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+            else:
+                connection.close()
+        finally:
+            self._slots.release()
+
+    def request(self, method, path, body=None, headers=None, timeout=None):
+        """
+        Ejecuta una petición y devuelve (código de estado, cuerpo en bytes).
+        Si una conexión reutilizada resultó estar cerrada por el servidor,
+        se reintenta una vez con una conexión nueva.
+        timeout (o el del pool) es el plazo total de la llamada: la espera por una
+        conexión libre, el reintento y la lectura completa de la respuesta cuentan
+        contra él, y al vencer se lanza TimeoutError.
+        """
+        full_path = f"{self.base_path}/{path.lstrip('/')}"
+        request_headers = {"Connection": "keep-alive"}
+        if headers:
+            request_headers.update(headers)
+
+        timeout = timeout if timeout is not None else self.timeout
+        deadline = _RequestDeadline(timeout) if timeout is not None else None
+        try:
+            connection, reused = self._acquire(deadline)
+        except BaseException:
+            if deadline is not None:
+                deadline.cancel()
+            raise
+        reusable = False
+        try:
+            if deadline is not None:
+                deadline.watch(connection)
+            try:
+                connection.request(method, full_path, body=body, headers=request_headers)
+                response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # El servidor cerró la conexión inactiva: reconectar de forma transparente
+                connection.close()
+                self.reconnects += 1
+                connection = self._new_connection(deadline.remaining() if deadline is not None else None)
+                if deadline is not None:
+                    deadline.watch(connection)
+                connection.request(method, full_path, body=body, headers=request_headers)
+                response = connection.getresponse()
+
+            data = response.read()
+            reusable = not response.will_close
+            return response.status, data
+        except Exception:
+            if deadline is not None and deadline.expired:
+                raise TimeoutError("La petición superó su plazo")
+            raise
+        finally:
+            if deadline is not None:
+                deadline.cancel()
+                # Un socket cerrado por el plazo no se devuelve al pool
+                reusable = reusable and not deadline.expired
+            self._release(connection, reusable)
+
+    def close(self):
+        """Cierra todas las conexiones inactivas del pool"""
+        with self._lock:
+            while self._idle:
+                connection, _ = self._idle.pop()
+                connection.close()
+
+    def stats(self):
+        """Devuelve los contadores de uso del pool"""
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            "opened": self.connections_opened,
+            "reused": self.connections_reused,
+            "reconnects": self.reconnects,
+            "idle": idle,
+        }
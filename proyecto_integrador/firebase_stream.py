@@ -0,0 +1,208 @@
+"""
+Suscripción en streaming (server-sent events) a los sensores en Firebase
+Mantiene una sola conexión text/event-stream y guarda en memoria la última lectura del LDR
+Usa solo bibliotecas estándar de Python
+"""
+
+import json
+import time
+import threading
+import http.client
+import urllib.parse
+
+from control_logging import get_logger, fields
+
+logger = get_logger("stream")
+
+
+class SensorStream:
+    def __init__(self, base_url, path="sensores", query="?orderBy=\"timestamp\"&limitToLast=1",
+                 read_timeout=60.0, reconnect_delay=1.0, max_reconnect_delay=30.0, stale_after=45.0):
+        self.base_url = base_url
+        self.path = path.strip("/")
+        self.query = query
+        # Firebase envía keep-alive cada ~30 s; sin datos en read_timeout se reconecta
+        self.read_timeout = read_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        # Sin ningún evento (ni keep-alive) en stale_after segundos la lectura deja de ser confiable
+        self.stale_after = stale_after
+
+        self._latest_key = None
+        self._latest = None
+        self._lock = threading.Condition()
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._thread = None
+        self._connection = None
+
+        self.last_update = None
+        self.last_event = None  # Último evento de la conexión actual, incluidos los keep-alive
+        self.updates = 0
+        self.events_received = 0
+        self.reconnects = 0
+
+    def start(self):
+        """Inicia el hilo que mantiene la conexión de streaming"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sensor-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el streaming y cierra la conexión"""
+        self._stop.set()
+        with self._lock:
+            self._lock.notify_all()
+        connection = self._connection
+        if connection is not None:
+            connection.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def wait_connected(self, timeout=None):
+        """Espera a que la conexión de streaming esté abierta"""
+        return self._connected.wait(timeout)
+
+    def wait_for_update(self, last_seen, timeout=None):
+        """Espera a que el contador de actualizaciones cambie respecto a last_seen; devuelve el actual"""
+        with self._lock:
+            self._lock.wait_for(lambda: self.updates != last_seen or self._stop.is_set(), timeout)
+            return self.updates
+
+    def latest(self):
+        """Devuelve una copia de la última lectura conocida (o None) sin bloquear"""
+        with self._lock:
+            return dict(self._latest) if self._latest is not None else None
+
+    def current(self):
+        """
+        Última lectura solo mientras el streaming está conectado y vivo (algún evento en
+        stale_after segundos, en la conexión actual); si no, None para volver a consultar
+        """
+        if not self._connected.is_set():
+            return None
+        last_event = self.last_event
+        if last_event is None or time.monotonic() - last_event > self.stale_after:
+            return None
+        return self.latest()
+
+    def _run(self):
+        """Bucle de conexión con reconexión y espera exponencial"""
+        delay = self.reconnect_delay
+        url = f"{self.base_url.rstrip('/')}/{self.path}.json{self.query}"
+        while not self._stop.is_set():
+            try:
+                self._listen(url)
+                delay = self.reconnect_delay
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logger.warning("Error en streaming de sensores: %s", e, extra=fields(reconnects=self.reconnects))
+            finally:
+                self._connected.clear()
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _open(self, url):
+        """Abre la conexión de eventos siguiendo las redirecciones de Firebase"""
+        for _ in range(3):
+            parsed = urllib.parse.urlsplit(url)
+            connection_class = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+            connection = connection_class(parsed.hostname, parsed.port, timeout=self.read_timeout)
+            target = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+            connection.request("GET", target, headers={"Accept": "text/event-stream"})
+            response = connection.getresponse()
+            if response.status in (301, 302, 307, 308):
+                url = response.getheader("Location")
+                connection.close()
+                continue
+            if response.status != 200:
+                connection.close()
+                raise ConnectionError(f"respuesta {response.status} al abrir el streaming")
+            return connection, response
+        raise ConnectionError("demasiadas redirecciones al abrir el streaming")
+
+    def _listen(self, url):
+        """Lee eventos SSE hasta que se cierre la conexión"""
+        connection, response = self._open(url)
+        self._connection = connection
+        self.last_event = None
+        self._connected.set()
+        event = None
+        data_lines = []
+        try:
+            while not self._stop.is_set():
+                line = response.readline()
+                if not line:
+                    return  # El servidor cerró la conexión
+                line = line.decode("utf-8").rstrip("\r\n")
+                if line == "":
+                    # Línea vacía: fin del evento
+                    if event is not None:
+                        self._handle_event(event, "\n".join(data_lines))
+                    event = None
+                    data_lines = []
+                elif line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data_lines.append(line[5:].strip())
+        finally:
+            self._connection = None
+            connection.close()
+
+    def _handle_event(self, event, data):
+        """Aplica un evento put/patch de Firebase a la lectura en memoria"""
+        self.last_event = time.monotonic()
+        if event in ("put", "patch"):
+            payload = json.loads(data)
+            self._apply(event, payload.get("path", "/"), payload.get("data"))
+            self.events_received += 1
+        elif event in ("cancel", "auth_revoked"):
+            raise ConnectionError(f"streaming cancelado por el servidor ({event})")
+        # "keep-alive" no requiere acción
+
+    def _apply(self, event, path, data):
+        """Actualiza la última lectura según la ruta del evento"""
+        parts = [p for p in path.split("/") if p]
+        with self._lock:
+            if not parts:
+                # Instantánea completa del nodo: buscar el timestamp más alto
+                if event == "put" and isinstance(data, dict):
+                    self._latest_key, self._latest = None, None
+                if isinstance(data, dict):
+                    for key, record in data.items():
+                        self._offer(key, record, merge=(event == "patch"))
+            elif len(parts) == 1:
+                self._offer(parts[0], data, merge=(event == "patch"))
+            elif parts[0] == self._latest_key and self._latest is not None:
+                # Cambio de un campo dentro de la lectura más reciente
+                if data is None:
+                    self._latest.pop(parts[1], None)
+                else:
+                    self._latest[parts[1]] = data
+            self.last_update = time.monotonic()
+            self.updates += 1
+            self._lock.notify_all()
+
+    def _offer(self, key, record, merge=False):
+        """Sustituye la lectura actual si el registro es más reciente (llamar con el lock tomado)"""
+        if key == self._latest_key:
+            # Un borrado (None) conserva el último valor conocido
+            if not isinstance(record, dict):
+                return
+            if merge and self._latest is not None:
+                self._latest.update(record)
+            else:
+                self._latest = dict(record)
+            return
+        if not isinstance(record, dict) or "timestamp" not in record:
+            return
+        current = int(self._latest.get("timestamp", 0)) if self._latest else 0
+        if int(record["timestamp"]) >= current:
+            self._latest_key = key
+            self._latest = dict(record)
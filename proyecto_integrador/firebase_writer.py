@@ -0,0 +1,134 @@
+"""
+Escritura diferida (write-behind) hacia Firebase
+Agrupa las escrituras de control y de registro en un solo PATCH multi-ruta por ciclo
+Usa solo bibliotecas estándar de Python
+"""
+
+import time
+import threading
+from collections import deque
+
+
+class WriteBehindBuffer:
+    def __init__(self, patch_fn, log_batch_size=5, log_flush_interval=30.0, max_pending=1000):
+        """
+        patch_fn(path, data) debe enviar un PATCH a Firebase y devolver True si tuvo éxito.
+        Los registros de análisis se acumulan hasta log_batch_size entradas o
+        log_flush_interval segundos y viajan con la siguiente escritura de control
+        (o solos con flush_due); la escritura de control nunca se retrasa.
+        write_log nunca envía, así que se puede llamar desde el hilo del bucle asyncio.
+        """
+        self.patch_fn = patch_fn
+        self.log_batch_size = log_batch_size
+        self.log_flush_interval = log_flush_interval
+        self.max_pending = max_pending
+
+        self._pending_logs = deque()
+        self._oldest_log_time = None
+        self._lock = threading.Lock()
+
+        # Contadores para medir la reducción de peticiones
+        self.writes_requested = 0
+        self.requests_sent = 0
+        self.logs_dropped = 0
+
+    def _logs_due(self, now):
+        """Indica si los registros acumulados ya deben enviarse (llamar con el lock tomado)"""
+        if not self._pending_logs:
+            return False
+        if len(self._pending_logs) >= self.log_batch_size:
+            return True
+        return now - self._oldest_log_time >= self.log_flush_interval
+
+    def _take_logs(self):
+        """Extrae hasta log_batch_size registros pendientes (llamar con el lock tomado)"""
+        taken = []
+        while self._pending_logs and len(taken) < self.log_batch_size:
+            taken.append(self._pending_logs.popleft())
+        self._oldest_log_time = time.monotonic() if self._pending_logs else None
+        return taken
+
+    def _requeue(self, entries):
+        """Devuelve registros que no se pudieron enviar al frente de la cola"""
+        with self._lock:
+            for entry in reversed(entries):
+                self._pending_logs.appendleft(entry)
+            while len(self._pending_logs) > self.max_pending:
+                self._pending_logs.pop()
+                self.logs_dropped += 1
+            if self._pending_logs and self._oldest_log_time is None:
+                self._oldest_log_time = time.monotonic()
+
+    def _send(self, updates):
+        """Envía un diccionario {ruta: datos} como un solo PATCH en la raíz"""
+        with self._lock:
+            self.requests_sent += 1
+        return self.patch_fn("", updates)
+
+    def write_control(self, path, data):
+        """
+        Envía la escritura de control de inmediato. Si hay registros de análisis
+        pendientes que ya cumplieron su umbral, viajan en la misma petición.
+        """
+        return self.write_controls({path: data})
+
+    def write_controls(self, controls):
+        """Envía varias escrituras de control {ruta: datos} en un solo PATCH inmediato"""
+        now = time.monotonic()
+        with self._lock:
+            self.writes_requested += len(controls)
+            logs = self._take_logs() if self._logs_due(now) else []
+
+        updates = dict(controls)
+        updates.update(logs)
+        if self._send(updates):
+            return True
+        if logs:
+            self._requeue(logs)
+        return False
+
+    def write_log(self, path, data):
+        """Encola un registro de análisis sin enviarlo; viaja con una escritura de control o con flush_due"""
+        with self._lock:
+            self.writes_requested += 1
+            if not self._pending_logs:
+                self._oldest_log_time = time.monotonic()
+            self._pending_logs.append((path, data))
+            if len(self._pending_logs) > self.max_pending:
+                self._pending_logs.popleft()
+                self.logs_dropped += 1
+        return True
+
+    def flush_due(self):
+        """
+        Envía solos los registros que ya cumplieron su umbral. Para ciclos sin escritura
+        de control (p. ej. omitida por la banda muerta), así los registros no esperan a una.
+        """
+        with self._lock:
+            logs = self._take_logs() if self._logs_due(time.monotonic()) else []
+        if logs and not self._send(dict(logs)):
+            self._requeue(logs)
+            return False
+        return True
+
+    def flush(self):
+        """Envía todos los registros pendientes"""
+        while True:
+            with self._lock:
+                logs = self._take_logs()
+            if not logs:
+                return True
+            if not self._send(dict(logs)):
+                self._requeue(logs)
+                return False
+
+    def stats(self):
+        """Devuelve los contadores de escrituras y peticiones"""
+        with self._lock:
+            pending = len(self._pending_logs)
+        return {
+            "writes": self.writes_requested,
+            "requests": self.requests_sent,
+            "pending": pending,
+            "dropped": self.logs_dropped,
+        }
@@ -0,0 +1,88 @@
+"""
+Historial de capacidad fija para el controlador (buffer circular por columnas)
+Cada columna es un array('d') preasignado: agregar es O(1) y la memoria no crece con la duración
+Usa solo bibliotecas estándar de Python
+"""
+
+import itertools
+from array import array
+
+
+class RingHistory:
+    def __init__(self, capacity, fields):
+        if capacity <= 0:
+            raise ValueError("La capacidad del historial debe ser mayor que cero")
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        # Columnas contiguas de float64 preasignadas (struct-of-arrays)
+        self._columns = {field: array('d', bytes(8 * capacity)) for field in self.fields}
+        self._ordered = [self._columns[field] for field in self.fields]
+        self._next = 0
+        self._size = 0
+        self.total = 0  # Muestras agregadas desde el inicio, incluidas las descartadas
+
+    def __len__(self):
+        return self._size
+
+    def append(self, *values):
+        """Agrega una fila con un valor por columna, en el orden de fields"""
+        index = self._next
+        for column, value in zip(self._ordered, values):
+            column[index] = value
+        self._next = (index + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        self.total += 1
+
+    def segments(self, field):
+        """
+        Devuelve la columna como vistas (memoryview) sin copia, en orden cronológico.
+        Son uno o dos segmentos según si el buffer ya dio la vuelta.
+        """
+        column = memoryview(self._columns[field])
+        if self._size < self.capacity:
+            return (column[:self._size],)
+        return (column[self._next:], column[:self._next])
+
+    def window(self, field, count):
+        """Devuelve los últimos count valores de la columna como vistas sin copia"""
+        count = min(count, self._size)
+        if count == 0:
+            return ()
+        column = memoryview(self._columns[field])
+        start = (self._next - count) % self.capacity
+        if start < self._next:
+            return (column[start:self._next],)
+        return (column[start:], column[:self._next])
+
+    def column(self, field):
+        """Itera los valores de una columna en orden cronológico"""
+        return itertools.chain.from_iterable(self.segments(field))
+
+    def rows(self):
+        """Itera las filas completas en orden cronológico"""
+        return zip(*(self.column(field) for field in self.fields))
+
+    def mean(self, field):
+        """Promedio de la columna sobre las muestras guardadas (0.0 si está vacía)"""
+        if self._size == 0:
+            return 0.0
+        return sum(sum(segment) for segment in self.segments(field)) / self._size
+
+    def maximum(self, field):
+        """Máximo de la columna sobre las muestras guardadas (0.0 si está vacía)"""
+        if self._size == 0:
+            return 0.0
+        return max(max(segment) for segment in self.segments(field) if len(segment))
+
+    def last(self, field):
+        """Devuelve el valor más reciente de la columna (o None si está vacía)"""
+        if self._size == 0:
+            return None
+        return self._columns[field][self._next - 1]
+
+    def clear(self):
+        """Vacía el historial sin liberar la memoria preasignada"""
+        self._next = 0
+        self._size = 0
+        self.total = 0
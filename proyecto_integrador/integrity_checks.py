@@ -0,0 +1,198 @@
+"""
+Verificaciones ejecutables de la descarga paginada por cursor y de la recuperación del outbox
+Cada verificación arma su escenario contra el servidor local de Firebase y lanza AssertionError si falla;
+`python integrity_checks.py` las ejecuta todas y termina con código 1 si alguna falla
+Usa solo bibliotecas estándar de Python
+"""
+
+import io
+import os
+import sys
+import json
+import tempfile
+import threading
+import contextlib
+
+from proyecto_integrador import SimpleAnnealingController, iter_sensor_pages, fetch_historical_data
+from firebase_local import LocalFirebaseServer
+from firebase_outbox import DurableOutbox
+from firebase_pool import FirebaseConnectionPool
+from sensor_cache import SensorCache
+from control_logging import quiet_logging
+
+# Lecturas con timestamps repetidos: grupos de 7 (cortan las páginas de 20) y un grupo de 45
+# (más grande que una página); ldr_value identifica cada registro para detectar pérdidas o duplicados
+RECORDS = 280
+PAGE_SIZE = 20
+# Un cursor que no avanza repite páginas sin fin: cada verificación tiene un límite de tiempo
+CHECK_TIMEOUT = 30.0
+
+
+def seed_duplicate_timestamps(server, count=RECORDS):
+    """Carga count lecturas cuyo ldr_value es su número de registro"""
+    timestamp = 1000
+    for i in range(count):
+        group = 45 if 100 <= i < 145 else 7
+        if i < 100:
+            timestamp = 1000 + i // group
+        elif i < 145:
+            timestamp = 2000
+        else:
+            timestamp = 3000 + (i - 145) // group
+        # Claves desordenadas respecto al timestamp, como los push ids de varios dispositivos
+        server.set(f"sensores/k{(i * 37) % count:04d}", {"timestamp": timestamp, "ldr_value": i})
+
+
+def _expect_each_once(values, count=RECORDS):
+    values = sorted(int(v) for v in values)
+    missing = sorted(set(range(count)) - set(values))
+    duplicated = len(values) - len(set(values))
+    assert not missing and not duplicated, f"faltan {missing[:10]}, {duplicated} duplicados"
+
+
+def check_sensor_pages(server, controller):
+    """iter_sensor_pages entrega cada registro una vez y en orden aunque los timestamps se repitan"""
+    values = []
+    last_timestamp = None
+    for records in iter_sensor_pages(controller, page_size=PAGE_SIZE):
+        for _, value in records:
+            assert last_timestamp is None or value['timestamp'] >= last_timestamp, "páginas fuera de orden"
+            last_timestamp = value['timestamp']
+            values.append(value['ldr_value'])
+    _expect_each_once(values)
+
+
+def check_fetch_resume(server, controller, directory):
+    """Una descarga cortada por max_records a mitad de un grupo se reanuda sin perder ni repetir"""
+    path = os.path.join(directory, "historicos.csv")
+    with contextlib.redirect_stdout(io.StringIO()):
+        first = fetch_historical_data(controller, page_size=PAGE_SIZE, max_records=100, path=path)
+        second = fetch_historical_data(controller, page_size=PAGE_SIZE, max_records=23, path=path)
+        total = fetch_historical_data(controller, page_size=PAGE_SIZE, path=path)
+        again = fetch_historical_data(controller, page_size=PAGE_SIZE, path=path)
+    assert (first, second, total, again) == (100, 123, RECORDS, RECORDS), (first, second, total, again)
+    with open(path) as f:
+        next(f)
+        _expect_each_once(line.split(",")[1] for line in f)
+
+
+def check_cache_sync(server, controller, directory):
+    """La caché local reanuda desde su marca de agua con las claves del último timestamp"""
+    cache = SensorCache(os.path.join(directory, "sensores.db"))
+    try:
+        added = [cache.sync(controller, page_size=PAGE_SIZE, max_records=limit) for limit in (100, 45, None, None)]
+        assert added == [100, 45, RECORDS - 145, 0], added
+        _expect_each_once(cache.iter_values())
+    finally:
+        cache.close()
+
+
+def _patch_fn(pool):
+    """PATCH multi-ruta en la raíz, como firebase_patch pero sin interruptor de circuito"""
+    def patch(path, updates):
+        status, _ = pool.request("PATCH", f"{path.strip('/')}.json", body=json.dumps(updates).encode('utf-8'),
+                                 headers={'Content-Type': 'application/json'})
+        return status == 200
+    return patch
+
+
+def check_outbox_torn_line(server, pool, directory):
+    """Una línea incompleta al final del diario se recorta y la entrada siguiente sobrevive al reinicio"""
+    path = os.path.join(directory, "torn.journal")
+    outbox = DurableOutbox(_patch_fn(pool), path)
+    outbox.enqueue("torn/a", 1)
+    outbox.stop()
+    with open(path, 'a') as f:
+        f.write('[2, "torn/b", ')  # Escritura interrumpida
+
+    outbox = DurableOutbox(_patch_fn(pool), path)
+    assert [entry[1] for entry in outbox._pending] == ["torn/a"], list(outbox._pending)
+    outbox.enqueue("torn/c", 3)
+    outbox.stop()
+
+    outbox = DurableOutbox(_patch_fn(pool), path, base_delay=0.05)
+    assert [entry[1] for entry in outbox._pending] == ["torn/a", "torn/c"], list(outbox._pending)
+    outbox.start()
+    assert outbox.wait_empty(5), outbox.stats()
+    outbox.stop()
+    assert server.get("torn") == {"a": 1, "c": 3}, server.get("torn")
+
+
+def check_outbox_ack_and_compaction(server, pool, directory):
+    """Lo confirmado no se reenvía tras reiniciar, y la compactación conserva la numeración"""
+    path = os.path.join(directory, "ack.journal")
+    # Sin hilo de envío: las escrituras quedan solo en el diario, como durante una caída
+    outbox = DurableOutbox(_patch_fn(pool), path, compact_bytes=1)
+    for i in range(10):
+        outbox.enqueue(f"ack/{i}", i)
+    outbox.stop()
+
+    outbox = DurableOutbox(_patch_fn(pool), path, batch_size=4, compact_bytes=1)
+    assert len(outbox._pending) == 10, outbox.stats()
+    outbox.start()
+    assert outbox.wait_empty(5), outbox.stats()
+    outbox.stop()
+    assert server.get("ack") == {str(i): i for i in range(10)}, server.get("ack")
+    assert os.path.getsize(path) == 0, "el diario confirmado no se compactó"
+
+    # Tras compactar, las entradas nuevas deben quedar por encima de la confirmación
+    outbox = DurableOutbox(_patch_fn(pool), path, compact_bytes=1)
+    assert not outbox._pending, list(outbox._pending)
+    outbox.enqueue("ack/10", 10)
+    outbox.stop()
+    outbox = DurableOutbox(_patch_fn(pool), path, compact_bytes=1)
+    assert [entry[1] for entry in outbox._pending] == ["ack/10"], list(outbox._pending)
+    outbox.stop()
+
+
+def _run_with_timeout(check, args):
+    """Ejecuta una verificación en un hilo; devuelve la excepción que lanzó (o None)"""
+    outcome = [TimeoutError(f"no terminó en {CHECK_TIMEOUT:.0f} s")]
+
+    def target():
+        try:
+            check(*args)
+            outcome[0] = None
+        except Exception as e:
+            outcome[0] = e
+
+    thread = threading.Thread(target=target, name=check.__name__, daemon=True)
+    thread.start()
+    thread.join(CHECK_TIMEOUT)
+    return outcome[0]
+
+
+def run_checks():
+    """Ejecuta todas las verificaciones; devuelve una lista de (nombre, error o None)"""
+    results = []
+    server = LocalFirebaseServer().start()
+    pool = FirebaseConnectionPool(server.url, timeout=5.0)
+    controller = SimpleAnnealingController(firebase_url=server.url)
+    try:
+        seed_duplicate_timestamps(server)
+        with tempfile.TemporaryDirectory() as directory, quiet_logging():
+            checks = [
+                (check_sensor_pages, (server, controller)),
+                (check_fetch_resume, (server, controller, directory)),
+                (check_cache_sync, (server, controller, directory)),
+                (check_outbox_torn_line, (server, pool, directory)),
+                (check_outbox_ack_and_compaction, (server, pool, directory)),
+            ]
+            for check, args in checks:
+                results.append((check.__name__, _run_with_timeout(check, args)))
+    finally:
+        controller.http.close()
+        pool.close()
+        server.stop()
+    return results
+
+
+if __name__ == "__main__":
+    failures = 0
+    for name, error in run_checks():
+        if error is None:
+            print(f"OK     {name}")
+        else:
+            failures += 1
+            print(f"FALLA  {name}: {type(error).__name__}: {error}")
+    sys.exit(1 if failures else 0)
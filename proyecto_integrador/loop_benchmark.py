@@ -0,0 +1,99 @@
+"""
+Benchmark del bucle de control contra el servidor local de Firebase
+Ejecuta ciclos del controlador a máxima velocidad y reporta ciclos/s y latencia p50/p95/p99 por ciclo
+Usa solo bibliotecas estándar de Python
+"""
+
+import time
+import random
+import argparse
+import contextlib
+from array import array
+
+from proyecto_integrador import SimpleAnnealingController
+from firebase_local import LocalFirebaseServer
+from control_logging import quiet_logging
+
+
+def percentile(sorted_values, fraction):
+    """Percentil por rango más cercano sobre una secuencia ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def seed_sensor_data(server, count=100, seed=0):
+    """Carga lecturas simuladas del LDR en el servidor local"""
+    rng = random.Random(seed)
+    base = int(time.time()) - count
+    for i in range(count):
+        server.set(f"sensores/s{i:06d}", {"timestamp": base + i, "ldr_value": rng.randint(300, 800)})
+
+
+def run_benchmark(ticks=1000, latency=0.0, latency_jitter=0.0, failure_rate=0.0,
+                  use_stream=False, seed=0, quiet=True):
+    """Ejecuta el bucle de control sin esperas y devuelve las métricas de rendimiento"""
+    server = LocalFirebaseServer(latency=latency, latency_jitter=latency_jitter,
+                                 failure_rate=failure_rate, seed=seed).start()
+    seed_sensor_data(server, seed=seed)
+    controller = SimpleAnnealingController(firebase_url=server.url, use_stream=use_stream,
+                                           history_capacity=ticks, seed=seed)
+    if controller.sensor_stream is not None:
+        controller.sensor_stream.start()
+        controller.sensor_stream.wait_connected(timeout=5)
+
+    latencies = array('d')
+    try:
+        with quiet_logging() if quiet else contextlib.nullcontext():
+            start = time.perf_counter()
+            for iteration in range(ticks):
+                tick_start = time.perf_counter()
+                controller.run_tick(iteration, tick_start - start)
+                latencies.append(time.perf_counter() - tick_start)
+            controller.writer.flush()
+            elapsed = time.perf_counter() - start
+    finally:
+        if controller.sensor_stream is not None:
+            controller.sensor_stream.stop()
+        controller.http.close()
+        server.stop()
+
+    ordered = sorted(latencies)
+    return {
+        "ticks": ticks,
+        "elapsed": elapsed,
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1] if ordered else 0.0,
+        "requests": server.requests_served,
+        "stages": controller.metrics.format_lines(),
+    }
+
+
+def print_report(result):
+    """Muestra el resultado del benchmark"""
+    print(f"Ciclos: {result['ticks']} en {result['elapsed']:.2f} s "
+          f"({result['ticks_per_second']:.1f} ciclos/s)")
+    print(f"Latencia por ciclo: p50={result['p50']*1000:.2f} ms | p95={result['p95']*1000:.2f} ms | "
+          f"p99={result['p99']*1000:.2f} ms | máx={result['max']*1000:.2f} ms")
+    print(f"Peticiones atendidas por el servidor: {result['requests']}")
+    print("Tiempos por etapa:")
+    for line in result["stages"]:
+        print(f"  {line}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del bucle de control contra un Firebase local")
+    parser.add_argument("--ticks", type=int, default=1000, help="número de ciclos a ejecutar")
+    parser.add_argument("--latency", type=float, default=0.0, help="latencia inyectada por petición (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="variación aleatoria de la latencia (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fracción de peticiones que fallan")
+    parser.add_argument("--stream", action="store_true", help="leer sensores por streaming")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print_report(run_benchmark(ticks=args.ticks, latency=args.latency, latency_jitter=args.jitter,
+                               failure_rate=args.failure_rate, use_stream=args.stream, seed=args.seed))
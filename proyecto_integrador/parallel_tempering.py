@@ -0,0 +1,189 @@
+"""
+Controlador de iluminación con Recocido Simulado en paralelo (parallel tempering)
+Mantiene varias cadenas a distintas temperaturas que exploran sobre un modelo local de la planta
+(luz medida frente a salida del foco) e intercambian estados periódicamente; solo la mejor
+salida se envía al foco, de modo que cada ciclo real aprovecha cientos de evaluaciones
+A diferencia del controlador base, requiere NumPy
+"""
+
+import time
+
+import numpy as np
+
+from proyecto_integrador import SimpleAnnealingController, load_historical_values
+from history_buffer import RingHistory
+from stage_metrics import timed
+from control_logging import quiet_logging
+
+# Aporte supuesto del foco (fracción de la escala del LDR con salida al 100%)
+# mientras no hay suficientes ciclos para estimarlo
+PRIOR_LAMP_GAIN = 0.3
+
+
+class ParallelTemperingController(SimpleAnnealingController):
+    def __init__(self, n_chains=8, t_min=1e-3, t_max=0.3, sweeps_per_tick=200, swap_every=10,
+                 cpu_budget=0.002, model_window=30, seed=None, **kwargs):
+        """
+        n_chains: número de cadenas (temperaturas en escala geométrica entre t_min y t_max)
+        sweeps_per_tick: máximo de pasos de todas las cadenas por ciclo real
+        swap_every: pasos entre intentos de intercambio entre temperaturas vecinas
+        cpu_budget: tiempo máximo de cálculo por ciclo en segundos
+        model_window: ciclos recientes usados para estimar la ganancia del foco
+        """
+        super().__init__(seed=seed, **kwargs)
+        self.name = "Recocido Simulado Paralelo"
+        self.description = "Control con varias cadenas de recocido a distintas temperaturas"
+
+        self.sweeps_per_tick = sweeps_per_tick
+        self.swap_every = swap_every
+        self.cpu_budget = cpu_budget
+
+        self.np_rng = np.random.default_rng(seed)
+        self.temperatures = np.geomspace(t_min, t_max, n_chains)
+        self.step_sizes = np.maximum(0.005, 0.3 * self.temperatures / t_max)
+        self.states = np.full(n_chains, self.current_output)
+        self.temperature = float(self.temperatures[0])
+
+        # Pares (salida aplicada, lectura normalizada) para el modelo local de la planta
+        self.plant_samples = RingHistory(model_window, ("output", "sensor"))
+        self.previous_output = None
+        self.lamp_gain = PRIOR_LAMP_GAIN
+        self.swaps_accepted = 0
+        self.swaps_attempted = 0
+
+    def estimate_lamp_gain(self):
+        """Pendiente de la lectura frente a la salida en la ventana reciente (o la ganancia previa)"""
+        if len(self.plant_samples) >= 3:
+            outputs = np.fromiter(self.plant_samples.column("output"), float, len(self.plant_samples))
+            sensors = np.fromiter(self.plant_samples.column("sensor"), float, len(self.plant_samples))
+            variance = outputs.var()
+            if variance > 1e-4:
+                slope = float(((outputs - outputs.mean()) * (sensors - sensors.mean())).mean() / variance)
+                # Un foco solo puede sumar luz; pendientes no físicas se descartan
+                if slope > 0.01:
+                    self.lamp_gain = min(slope, 1.0)
+        return self.lamp_gain
+
+    def _swap_replicas(self, energies, offset):
+        """Intenta intercambiar estados entre temperaturas vecinas (pares pares o impares)"""
+        i = np.arange(offset, len(self.temperatures) - 1, 2)
+        if len(i) == 0:
+            return
+        j = i + 1
+        log_ratio = (1 / self.temperatures[i] - 1 / self.temperatures[j]) * (energies[i] - energies[j])
+        swap = np.log(self.np_rng.random(len(i))) < np.minimum(0.0, log_ratio)
+        i, j = i[swap], j[swap]
+        self.states[i], self.states[j] = self.states[j], self.states[i]
+        energies[i], energies[j] = energies[j], energies[i]
+        self.swaps_attempted += len(swap)
+        self.swaps_accepted += len(i)
+
+    @timed("calculate")
+    def calculate_next_output(self, sensor_value):
+        """Ejecuta las cadenas sobre el modelo local y devuelve la mejor salida encontrada"""
+        normalized_sensor = sensor_value / 1023.0
+        current_error = abs(self.target - normalized_sensor)
+
+        # La lectura actual es consecuencia de la salida enviada en el ciclo anterior
+        if self.previous_output is not None:
+            self.plant_samples.append(self.previous_output, normalized_sensor)
+        gain = self.estimate_lamp_gain()
+        applied = self.current_output
+
+        def energy(outputs):
+            # Error previsto si se aplicara cada salida, linealizando alrededor del estado actual
+            return np.abs(self.target - (normalized_sensor + gain * (outputs - applied)))
+
+        deadline = time.perf_counter() + self.cpu_budget
+        energies = energy(self.states)
+        n_chains = len(self.states)
+        sweeps = 0
+        while sweeps < self.sweeps_per_tick and time.perf_counter() < deadline:
+            proposals = np.clip(self.states + self.np_rng.uniform(-1.0, 1.0, n_chains) * self.step_sizes, 0.0, 1.0)
+            proposal_energies = energy(proposals)
+            accept = np.log(self.np_rng.random(n_chains)) < (energies - proposal_energies) / self.temperatures
+            self.states = np.where(accept, proposals, self.states)
+            energies = np.where(accept, proposal_energies, energies)
+            sweeps += 1
+            if sweeps % self.swap_every == 0:
+                self._swap_replicas(energies, (sweeps // self.swap_every) % 2)
+        self.metrics.increment("pt_sweeps", sweeps)
+
+        best = int(np.argmin(energies))
+        output = float(self.states[best])
+        self.current_output = output
+        self.previous_output = output
+
+        if current_error < self.best_error:
+            self.best_error = current_error
+            self.best_output = applied
+
+        self.last_error = current_error
+        self.iteration += 1
+        return output
+
+
+def replay(controller, values, lamp_gain=PRIOR_LAMP_GAIN, noise=0.01, convergence_tol=0.05,
+           settle_ticks=5, seed=0):
+    """
+    Reproduce una serie de luz ambiental con una planta simulada (ambiente + ganancia * salida + ruido).
+    Devuelve el error promedio y el primer ciclo a partir del cual el error se mantuvo
+    settle_ticks ciclos por debajo de convergence_tol.
+    """
+    rng = np.random.default_rng(seed)
+    output = controller.current_output
+    total_error = 0.0
+    converged_at = None
+    streak = 0
+    ticks = 0
+    with quiet_logging():
+        for tick, ambient in enumerate(values):
+            light = ambient + lamp_gain * 1023 * output + rng.normal(0, noise * 1023)
+            sensor_value = max(0.0, min(1023.0, light))
+            output = controller.calculate_next_output(sensor_value)
+            total_error += controller.last_error
+            ticks += 1
+            streak = streak + 1 if controller.last_error <= convergence_tol else 0
+            if converged_at is None and streak >= settle_ticks:
+                converged_at = tick - settle_ticks + 1
+    controller.http.close()
+    return {
+        "avg_error": total_error / ticks if ticks else 0.0,
+        "converged_at": converged_at,
+        "calculate": controller.metrics.summary()["stages"].get("calculate", {}),
+    }
+
+
+def benchmark(values, seeds=range(5), **kwargs):
+    """Compara el controlador de una cadena con el de varias cadenas sobre la misma serie"""
+    results = {}
+    for label, factory in (("Una cadena", lambda seed: SimpleAnnealingController(history_capacity=1, seed=seed)),
+                           ("Varias cadenas", lambda seed: ParallelTemperingController(history_capacity=1,
+                                                                                      seed=seed))):
+        runs = [replay(factory(seed), values, seed=seed, **kwargs) for seed in seeds]
+        converged = [run["converged_at"] for run in runs if run["converged_at"] is not None]
+        results[label] = {
+            "avg_error": float(np.mean([run["avg_error"] for run in runs])),
+            "converged_rate": len(converged) / len(runs),
+            "convergence_ticks": float(np.mean(converged)) if converged else float("inf"),
+            "p99_ms": max(run["calculate"].get("p99_ms", 0.0) for run in runs),
+        }
+    return results
+
+
+def print_benchmark(results):
+    print(f"{'Controlador':<16} {'Error prom.':>11} {'Conv.':>6} {'Ciclos':>8} {'p99 cálculo':>12}")
+    for label, row in results.items():
+        ticks = f"{row['convergence_ticks']:.1f}" if row['convergence_ticks'] != float("inf") else "-"
+        print(f"{label:<16} {row['avg_error']:>11.4f} {row['converged_rate']*100:>5.0f}% {ticks:>8} "
+              f"{row['p99_ms']:>9.3f} ms")
+
+
+if __name__ == "__main__":
+    try:
+        values = list(load_historical_values())
+    except FileNotFoundError:
+        # Sin historial descargado: luz ambiental constante con un escalón a mitad de la serie
+        values = [400.0] * 150 + [500.0] * 150
+    print(f"Valores de luz ambiental: {len(values)}")
+    print_benchmark(benchmark(values))
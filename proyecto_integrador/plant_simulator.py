@@ -0,0 +1,229 @@
+"""
+Simulador vectorizado de la planta (LDR frente a PWM del foco) para ajustar el controlador
+Ajusta un modelo de primer orden con retardo y ruido a partir del registro de control y simula
+miles de episodios en lazo cerrado a la vez como arreglos de NumPy
+A diferencia del controlador base, requiere NumPy
+"""
+
+import os
+import time
+import itertools
+
+import numpy as np
+
+from proyecto_integrador import TARGET_INTENSITY, HISTORICAL_CSV, load_historical_values
+from results_sink import iter_runs
+from sa_sweep import DEFAULT_GRID, DEFAULT_LAMP_GAIN, DEFAULT_CONVERGENCE_TOL, print_ranking
+
+CONTROL_LOG = 'resultados_recocido_simulado.csv'
+
+
+class PlantModel:
+    """
+    Respuesta normalizada del LDR (0-1) a la salida del foco (0-1):
+        s[t+1] = s[t] + alpha * (ambiente[t] + gain * u[t - delay] - s[t]) + ruido
+    alpha = 1 es una respuesta inmediata; valores menores, un retraso de primer orden.
+    """
+
+    def __init__(self, alpha=1.0, gain=DEFAULT_LAMP_GAIN, delay=0, noise=0.01, ambient=0.4):
+        self.alpha = alpha
+        self.gain = gain
+        self.delay = delay
+        self.noise = noise
+        self.ambient = ambient
+
+    def __repr__(self):
+        return (f"PlantModel(alpha={self.alpha:.3f}, gain={self.gain:.3f}, delay={self.delay}, "
+                f"noise={self.noise:.4f}, ambient={self.ambient:.3f})")
+
+    @classmethod
+    def fit(cls, sensor, output, max_delay=3):
+        """
+        Ajusta el modelo por mínimos cuadrados sobre s[t+1] = a*s[t] + b*u[t-d] + c,
+        probando cada retardo d hasta max_delay y conservando el de menor residuo.
+        sensor y output son series del mismo ciclo (sensor normalizado 0-1).
+        """
+        sensor = np.asarray(sensor, dtype=float)
+        output = np.asarray(output, dtype=float)
+        best = None
+        for delay in range(max_delay + 1):
+            n = len(sensor) - 1 - delay
+            if n < 3:
+                break
+            design = np.column_stack([sensor[delay:-1], output[:n], np.ones(n)])
+            coefficients, _, rank, _ = np.linalg.lstsq(design, sensor[delay + 1:], rcond=None)
+            if rank < 3:
+                continue
+            residuals = sensor[delay + 1:] - design @ coefficients
+            if best is None or residuals.std() < best[0]:
+                best = (residuals.std(), delay, coefficients)
+        if best is None:
+            return cls()
+
+        noise, delay, (a, b, c) = best
+        alpha = float(np.clip(1.0 - a, 0.05, 1.0))
+        gain = b / alpha
+        if gain <= 0:
+            # Sin variación suficiente de la salida la ganancia no es identificable
+            return cls(alpha=alpha, delay=delay, noise=float(noise), ambient=float(c / alpha))
+        return cls(alpha=alpha, gain=float(gain), delay=delay, noise=float(noise), ambient=float(c / alpha))
+
+    @classmethod
+    def from_control_log(cls, path=CONTROL_LOG, max_delay=3, run=-1):
+        """
+        Ajusta el modelo con el registro por ciclo del controlador (ResultsSink).
+        Se usa una sola ejecución (por defecto la última) para no enlazar s[t+1] entre ejecuciones.
+        """
+        data = load_control_log(path)[run]
+        return cls.fit(data[:, 1] / 1023.0, data[:, 2], max_delay)
+
+    def step(self, sensor, ambient, delayed_output, rng):
+        """Avanza un ciclo para todos los episodios a la vez"""
+        target_light = ambient + self.gain * delayed_output
+        noise = rng.normal(0.0, self.noise, sensor.shape) if self.noise > 0 else 0.0
+        return np.clip(sensor + self.alpha * (target_light - sensor) + noise, 0.0, 1.0)
+
+
+def load_control_log(path=CONTROL_LOG):
+    """
+    Lee el registro por ciclo (Tiempo, Sensor, Salida, Temperatura, Error) como una lista con
+    un arreglo (n, 5) por ejecución; las ejecuciones sin filas se omiten
+    """
+    runs = [np.array(rows, dtype=float) for rows in iter_runs(path) if rows]
+    if not runs:
+        raise ValueError(f"'{path}' no contiene ciclos registrados")
+    return runs
+
+
+def ambient_windows(values, n_episodes, ticks, rng, model=None):
+    """
+    Recorta n_episodes ventanas aleatorias de ticks lecturas históricas (normalizadas) como luz ambiental.
+    Sin historial suficiente se usa la luz ambiental constante del modelo.
+    """
+    values = np.asarray(values, dtype=float) / 1023.0
+    if len(values) < ticks:
+        ambient = model.ambient if model is not None else 0.4
+        return np.full((n_episodes, ticks), ambient)
+    starts = rng.integers(0, len(values) - ticks + 1, n_episodes)
+    return values[starts[:, None] + np.arange(ticks)]
+
+
+def simulate(model, ambient, initial_temp=100, cooling_rate=0.95, min_temp=0.1, reset_temp_interval=50,
+             target=TARGET_INTENSITY, convergence_tol=DEFAULT_CONVERGENCE_TOL, seed=None):
+    """
+    Simula en lazo cerrado un episodio por fila de ambient (n_episodes, ticks).
+    Los parámetros del recocido pueden ser escalares o arreglos (n_episodes,) para evaluar
+    configuraciones distintas en el mismo lote. Reproduce paso a paso la lógica de
+    SimpleAnnealingController.calculate_next_output.
+    """
+    rng = np.random.default_rng(seed)
+    n_episodes, ticks = ambient.shape
+    initial_temp = np.broadcast_to(np.asarray(initial_temp, dtype=float), (n_episodes,))
+    cooling_rate = np.broadcast_to(np.asarray(cooling_rate, dtype=float), (n_episodes,))
+    min_temp = np.broadcast_to(np.asarray(min_temp, dtype=float), (n_episodes,))
+    reset_temp_interval = np.broadcast_to(np.asarray(reset_temp_interval, dtype=int), (n_episodes,))
+
+    temperature = initial_temp.copy()
+    current = np.full(n_episodes, 0.5)
+    best_output = np.full(n_episodes, 0.5)
+    best_error = np.full(n_episodes, np.inf)
+    # Salidas aplicadas en los últimos delay + 1 ciclos (la primera es la más antigua)
+    applied = np.full((model.delay + 1, n_episodes), 0.5)
+    sensor = ambient[:, 0] + model.gain * 0.5
+
+    total_error = np.zeros(n_episodes)
+    converged_at = np.full(n_episodes, -1)
+
+    for tick in range(ticks):
+        error = np.abs(target - sensor)
+        total_error += error
+        converged_at = np.where((converged_at < 0) & (error <= convergence_tol), tick, converged_at)
+
+        if tick > 0:
+            reset = tick % reset_temp_interval == 0
+            temperature = np.where(reset, initial_temp, temperature)
+        cold = temperature <= min_temp
+
+        max_change = 0.3 * temperature / initial_temp
+        proposal = np.clip(current + rng.uniform(-1.0, 1.0, n_episodes) * max_change, 0.0, 1.0)
+        light_too_low = sensor < target
+        favorable = (light_too_low & (proposal > current)) | (~light_too_low & (proposal < current))
+        with np.errstate(divide='ignore', over='ignore'):
+            acceptance = np.exp(-error / temperature)
+        accept = ~cold & (favorable | (rng.random(n_episodes) < acceptance))
+        current = np.where(accept, proposal, current)
+        temperature = np.where(cold, temperature, temperature * cooling_rate)
+        output = np.where(cold, best_output, current)
+
+        improved = error < best_error
+        best_error = np.where(improved, error, best_error)
+        best_output = np.where(improved, current, best_output)
+
+        applied = np.roll(applied, -1, axis=0)
+        applied[-1] = output
+        if tick + 1 < ticks:
+            sensor = model.step(sensor, ambient[:, tick], applied[0], rng)
+
+    return {
+        "avg_error": total_error / ticks,
+        "best_error": best_error,
+        "converged_at": converged_at,
+        "final_temp": temperature,
+    }
+
+
+def tune(model, values, grid=None, episodes=20, ticks=600, target=TARGET_INTENSITY,
+         convergence_tol=DEFAULT_CONVERGENCE_TOL, seed=0):
+    """
+    Evalúa todas las combinaciones de la rejilla (como sa_sweep) con episodes episodios cada una,
+    todo en un solo lote. Devuelve la misma tabla de resultados que run_sweep.
+    """
+    grid = grid or DEFAULT_GRID
+    configurations = list(itertools.product(grid["initial_temp"], grid["cooling_rate"],
+                                            grid["min_temp"], grid["reset_temp_interval"]))
+    params = np.repeat(np.array(configurations, dtype=float), episodes, axis=0)
+    rng = np.random.default_rng(seed)
+    ambient = ambient_windows(values, len(params), ticks, rng, model)
+    result = simulate(model, ambient, params[:, 0], params[:, 1], params[:, 2], params[:, 3].astype(int),
+                      target=target, convergence_tol=convergence_tol, seed=seed)
+
+    shape = (len(configurations), episodes)
+    avg_error = result["avg_error"].reshape(shape)
+    best_error = result["best_error"].reshape(shape)
+    converged_at = result["converged_at"].reshape(shape)
+    converged = converged_at >= 0
+    converged_count = converged.sum(axis=1)
+    with np.errstate(invalid='ignore'):
+        convergence_ticks = np.where(converged, converged_at, 0).sum(axis=1) / converged_count
+
+    ranking = []
+    for index, (initial_temp, cooling_rate, min_temp, reset_temp_interval) in enumerate(configurations):
+        ranking.append({
+            "initial_temp": initial_temp,
+            "cooling_rate": cooling_rate,
+            "min_temp": min_temp,
+            "reset_temp_interval": reset_temp_interval,
+            "avg_error": float(avg_error[index].mean()),
+            "best_error": float(best_error[index].mean()),
+            "converged_rate": float(converged_count[index] / episodes),
+            "convergence_ticks": float(convergence_ticks[index]) if converged_count[index] else float("inf"),
+        })
+    ranking.sort(key=lambda row: (row["avg_error"], row["convergence_ticks"]))
+    return ranking
+
+
+if __name__ == "__main__":
+    if os.path.exists(CONTROL_LOG):
+        model = PlantModel.from_control_log()
+        print(f"Modelo ajustado con '{CONTROL_LOG}': {model}")
+    else:
+        model = PlantModel()
+        print(f"Sin registro de control; modelo predeterminado: {model}")
+
+    values = list(load_historical_values()) if os.path.exists(HISTORICAL_CSV) else []
+    print(f"Valores históricos de luz ambiental: {len(values)}")
+
+    start = time.time()
+    ranking = tune(model, values)
+    print(f"Simulación completada: {len(ranking)} configuraciones en {time.time() - start:.1f} s")
+    print_ranking(ranking)
@@ -7,21 +7,41 @@ Usa solo bibliotecas estándar de Python
 
 import time
 import json
+import asyncio
 import random
 import math
-import urllib.request
-import urllib.error
-import urllib.parse
+import os
 from datetime import datetime
 
+from firebase_pool import FirebaseConnectionPool
+from firebase_writer import WriteBehindBuffer
+from firebase_stream import SensorStream
+from history_buffer import RingHistory
+from results_sink import ResultsSink, RunningStats
+from telemetry_archive import TelemetryArchiveWriter
+from stage_metrics import StageMetrics, timed
+from adaptive_sampler import AdaptiveSampler
+from write_deadband import DeadbandFilter
+from firebase_outbox import DurableOutbox
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from control_logging import get_logger, fields, configure_logging
+
 # Configuración de conexión con Firebase
 FIREBASE_URL = "https://embebidos-pi-default-rtdb.firebaseio.com/"
 
 # Objetivo de intensidad lumínica (normalizado entre 0-1)
 TARGET_INTENSITY = 0.65  # Valor objetivo para el sensor LDR
 
+logger = get_logger()
+firebase_logger = get_logger("firebase")
+
 class SimpleAnnealingController:
-    def __init__(self, initial_temp=100, cooling_rate=0.95, min_temp=0.1):
+    def __init__(self, initial_temp=100, cooling_rate=0.95, min_temp=0.1,
+                 pool_size=4, idle_timeout=30.0, log_batch_size=5, log_flush_interval=30.0,
+                 use_stream=False, history_capacity=86400, results_log=None,
+                 reset_temp_interval=50, seed=None, target=None, firebase_url=None,
+                 control_deadband=2, log_deadband=4, heartbeat_interval=60.0, outbox_path=None,
+                 request_timeout=10.0, tick_budget=None, archive_path=None):
         self.name = "Recocido Simulado"
         self.description = "Control basado en Recocido Simulado para iluminación"
         self.temperature = initial_temp
@@ -29,73 +49,163 @@ class SimpleAnnealingController:
         self.cooling_rate = cooling_rate
         self.min_temp = min_temp
         
+        # Objetivo de intensidad propio (por defecto el global del módulo)
+        self.target = TARGET_INTENSITY if target is None else target
+        
         # Estado actual y mejor estado
         self.current_output = 0.5  # Comenzamos con salida media
         self.best_output = 0.5
         self.best_error = float('inf')
         
         self.iteration = 0
-        self.reset_temp_interval = 50  # Reiniciar temperatura cada 50 iteraciones
-        
-        # Datos para análisis
-        self.sensors_history = []
-        self.outputs_history = []
-        self.temperature_history = []
-        self.error_history = []
-        self.timestamp_history = []
+        self.reset_temp_interval = reset_temp_interval  # Reiniciar temperatura cada N iteraciones
+        self.reset_pending = False  # Reinicio periódico pospuesto mientras la planta está estable
+        
+        # Generador aleatorio propio para que cada ejecución sea reproducible
+        self.rng = random.Random(seed)
+        
+        # Datos para análisis (buffer circular de capacidad fija)
+        self.history = RingHistory(history_capacity, ("timestamp", "sensor", "output", "temperature", "error"))
+        self.last_error = None
+        # Media del error de toda la ejecución (el historial solo guarda la ventana reciente)
+        self.error_stats = RunningStats()
         self.last_firebase_data = None
+        
+        # Registro incremental en disco de cada ciclo (opcional)
+        self.results_sink = ResultsSink(results_log) if results_log else None
+        
+        # Archivo binario compacto de la ejecución (opcional)
+        self.archive = TelemetryArchiveWriter(archive_path, self.run_parameters()) if archive_path else None
+        if self.archive is not None and self.archive.rotated_path:
+            logger.info("Archivo de telemetría anterior conservado", extra=fields(path=self.archive.rotated_path))
+        
+        # Histogramas de latencia por etapa del ciclo de control
+        self.metrics = StageMetrics()
+        
+        # Métricas de planificación del modo asíncrono
+        self.tick_lag_history = RingHistory(history_capacity, ("lag",))
+        self.missed_deadlines = 0
+        
+        # Muestreo adaptativo (se activa al ejecutar con max_sample_interval)
+        self.sampler = None
+        
+        # Tiempo máximo por llamada: con presupuesto por ciclo, la mitad para la lectura
+        # y la mitad para la escritura de control
+        self.request_timeout = tick_budget / 2 if tick_budget else request_timeout
+        
+        # Pool de conexiones keep-alive hacia Firebase
+        self.firebase_url = firebase_url or FIREBASE_URL
+        self.http = FirebaseConnectionPool(self.firebase_url, max_connections=pool_size, idle_timeout=idle_timeout,
+                                           timeout=self.request_timeout)
+        
+        # Tras fallas o respuestas lentas repetidas se deja de llamar a Firebase por un tiempo
+        self.breaker = CircuitBreaker(slow_call_threshold=0.8 * self.request_timeout)
+        
+        # Con outbox la telemetría (registros y resultados finales) se anexa a un diario en disco
+        # y un hilo la envía. Las señales de control no pasan por él: esperarían detrás del
+        # diario y de los reintentos, y una señal vieja no sirve de nada tras un reinicio
+        self.outbox = DurableOutbox(self.firebase_patch, outbox_path) if outbox_path else None
+        
+        # Escrituras de control (y registros, sin outbox) agrupadas en un PATCH multi-ruta
+        self.writer = WriteBehindBuffer(self.firebase_patch, log_batch_size=log_batch_size,
+                                        log_flush_interval=log_flush_interval)
+        
+        # Suscripción en streaming a los sensores (se abre al iniciar el controlador)
+        self.sensor_stream = SensorStream(self.firebase_url) if use_stream else None
+        
+        # Omitir escrituras sin cambios: banda muerta en pasos de PWM (control) y en
+        # unidades del LDR más PWM (registro), con una escritura de latido cada heartbeat_interval.
+        # Por defecto 2 pasos de PWM (0.8 %, menos que la exploración del recocido en cada ciclo)
+        # y 4 unidades del LDR; el latido supera el intervalo máximo habitual del muestreo adaptativo
+        self.control_filter = DeadbandFilter(control_deadband, heartbeat_interval)
+        self.log_filter = DeadbandFilter((log_deadband, control_deadband), heartbeat_interval)
     
     def create_neighbor_solution(self):
         """Genera una solución vecina con perturbación proporcional a la temperatura."""
         max_change = 0.3 * (self.temperature / self.initial_temp)
         
         # Generar un valor vecino con perturbación proporcional a la temperatura
-        change = random.uniform(-max_change, max_change)
+        change = self.rng.uniform(-max_change, max_change)
         new_output = self.current_output + change
         # Limitar salida entre 0 y 1
         new_output = max(0, min(1, new_output))
             
         return new_output
     
+    def firebase_request(self, method, path, body=None, headers=None):
+        """Petición al pool protegida por el interruptor de circuito; devuelve (estado, cuerpo)"""
+        try:
+            return self.breaker.request(self.http, method, path, body=body, headers=headers)
+        except CircuitOpenError:
+            self.metrics.increment("circuit_rejected")
+            raise
+    
     def firebase_get(self, path, query=""):
-        """Lee datos de Firebase usando urllib"""
+        """Lee datos de Firebase reutilizando conexiones del pool"""
         try:
             # Quitar la primera / si existe para evitar doble barra
             if path.startswith("/"):
                 path = path[1:]
                 
-            url = f"{FIREBASE_URL}{path}.json{query}"
-            print(f"GET URL: {url}")
-            with urllib.request.urlopen(url) as response:
-                if response.code == 200:
-                    return json.loads(response.read().decode('utf-8'))
+            firebase_logger.debug("GET %s%s.json%s", self.firebase_url, path, query)
+            status, body = self.firebase_request("GET", f"{path}.json{query}")
+            if status == 200:
+                return json.loads(body.decode('utf-8'))
+            return None
+        except CircuitOpenError:
             return None
         except Exception as e:
-            print(f"Error en firebase_get: {e}")
+            firebase_logger.warning("Error en firebase_get: %s", e)
             return None
     
     def firebase_put(self, path, data):
-        """Envía datos a Firebase usando urllib"""
+        """Envía datos a Firebase reutilizando conexiones del pool"""
         try:
             # Quitar la primera / si existe para evitar doble barra
             if path.startswith("/"):
                 path = path[1:]
                 
-            url = f"{FIREBASE_URL}{path}.json"
-            print(f"PUT URL: {url}")
+            firebase_logger.debug("PUT %s%s.json", self.firebase_url, path)
             data_json = json.dumps(data).encode('utf-8')
-            req = urllib.request.Request(url, data=data_json, method='PUT')
-            req.add_header('Content-Type', 'application/json')
-            
-            with urllib.request.urlopen(req) as response:
-                return response.code == 200
+            status, _ = self.firebase_request("PUT", f"{path}.json", body=data_json,
+                                              headers={'Content-Type': 'application/json'})
+            return status == 200
+        except CircuitOpenError:
+            return False
+        except Exception as e:
+            firebase_logger.warning("Error en firebase_put: %s", e)
+            return False
+    
+    def firebase_patch(self, path, data):
+        """Actualiza varias rutas de Firebase en una sola petición PATCH"""
+        try:
+            # Quitar la primera / si existe para evitar doble barra
+            if path.startswith("/"):
+                path = path[1:]
+                
+            firebase_logger.debug("PATCH %s%s.json", self.firebase_url, path)
+            data_json = json.dumps(data).encode('utf-8')
+            status, _ = self.firebase_request("PATCH", f"{path}.json", body=data_json,
+                                              headers={'Content-Type': 'application/json'})
+            return status == 200
+        except CircuitOpenError:
+            return False
         except Exception as e:
-            print(f"Error en firebase_put: {e}")
+            firebase_logger.warning("Error en firebase_patch: %s", e)
             return False
     
+    @timed("read_sensor")
     def read_sensor_from_firebase(self):
         """Lee el valor del sensor desde Firebase"""
         try:
+            # Con streaming conectado y vivo la lectura es local y no bloquea;
+            # si se cayó o está reconectando, se consulta a Firebase
+            if self.sensor_stream is not None:
+                latest_sensor = self.sensor_stream.current()
+                if latest_sensor and 'ldr_value' in latest_sensor:
+                    self.last_firebase_data = latest_sensor
+                    return latest_sensor.get('ldr_value', 512)
+            
             # Obtener los últimos datos del sensor en Firebase
             sensor_data = self.firebase_get("sensores", "?orderBy=\"timestamp\"&limitToLast=1")
             
@@ -115,12 +225,15 @@ class SimpleAnnealingController:
                     self.last_firebase_data = latest_sensor
                     return latest_sensor.get('ldr_value', 512)
             
-            # Si no se pueden obtener datos o no están disponibles, usar último valor conocido o simulación
-            if self.last_firebase_data and 'ldr_value' in self.last_firebase_data:
-                return self.last_firebase_data.get('ldr_value', 512)
-                
         except Exception as e:
-            print(f"Error leyendo datos de Firebase: {e}")
+            firebase_logger.warning("Error leyendo datos de Firebase: %s", e)
+            
+        return self.fallback_sensor_value()
+    
+    def fallback_sensor_value(self):
+        """Último valor conocido del sensor o, si no hay ninguno, un valor simulado"""
+        if self.last_firebase_data and 'ldr_value' in self.last_firebase_data:
+            return self.last_firebase_data.get('ldr_value', 512)
             
         # Si no hay datos, simular valor
         # Valor base + ruido + tendencia según hora del día
@@ -129,61 +242,90 @@ class SimpleAnnealingController:
         day_factor = 1.0 if 8 <= hour <= 18 else 0.3  # Día/noche
         
         trend = base * day_factor
-        noise = random.uniform(-50, 50)  # Usando random en lugar de numpy
+        noise = self.rng.uniform(-50, 50)  # Usando random en lugar de numpy
         return max(0, min(1023, int(trend + noise)))
     
+    def build_control_payload(self, output, timestamp):
+        """Crea el registro de la señal de control para Firebase"""
+        # Convertir valor normalizado (0-1) a PWM (0-255)
+        pwm_value = int(output * 255)
+        return {
+            "timestamp": timestamp,
+            "heuristic": self.name,
+            "temperature": self.temperature,
+            "output_value": output,
+            "pwm_value": pwm_value
+        }
+    
+    def build_log_payload(self, sensor_value, output_value, timestamp):
+        """Crea el registro de análisis de un ciclo para Firebase"""
+        # Normalizar valor del sensor
+        normalized_sensor = sensor_value / 1023.0
+        error = abs(self.target - normalized_sensor)
+        return {
+            "timestamp": timestamp,
+            "temperature": self.temperature,
+            "heuristic": self.name,
+            "sensor_value": sensor_value,
+            "normalized_value": normalized_sensor,
+            "output_value": output_value,
+            "error": error,
+            "target": self.target
+        }
+    
     def send_control_signal_to_firebase(self, output):
         """Envía la señal de control para el foco a Firebase"""
+        return self.send_control_payload(self.build_control_payload(output, int(time.time())))
+    
+    @timed("send_control")
+    def send_control_payload(self, data):
+        """Envía una señal de control ya construida (el modo asíncrono la crea en el hilo del bucle)"""
         try:
-            # Convertir valor normalizado (0-1) a PWM (0-255)
-            pwm_value = int(output * 255)
+            timestamp = data["timestamp"]
             
-            # Crear payload
-            timestamp = int(time.time())
-            data = {
-                "timestamp": timestamp,
-                "heuristic": self.name,
-                "temperature": self.temperature,
-                "output_value": output,
-                "pwm_value": pwm_value
-            }
+            # El foco conserva la última señal: si el PWM no cambió no hace falta reenviarla,
+            # pero los registros pendientes que ya tocan se envían solos
+            if not self.control_filter.should_write(data["pwm_value"]):
+                self.writer.flush_due()
+                return True
             
-            # Enviar a Firebase
-            return self.firebase_put(f"control/{timestamp}", data)
+            # Enviar a Firebase de inmediato (junto con los registros pendientes)
+            sent = self.writer.write_control(f"control/{timestamp}", data)
+            if sent:
+                self.control_filter.mark_written(data["pwm_value"])
+            return sent
                 
         except Exception as e:
-            print(f"Error en send_control_signal_to_firebase: {e}")
+            firebase_logger.warning("Error en send_control_signal_to_firebase: %s", e)
             return False
     
+    @timed("log")
     def log_to_firebase(self, sensor_value, output_value):
         """Registra datos en Firebase para análisis posterior"""
         try:
-            # Crear payload
             timestamp = int(time.time())
+            data = self.build_log_payload(sensor_value, output_value, timestamp)
             
-            # Normalizar valor del sensor
-            normalized_sensor = sensor_value / 1023.0
-            error = abs(TARGET_INTENSITY - normalized_sensor)
+            pwm_value = int(output_value * 255)
+            if not self.log_filter.should_write(sensor_value, pwm_value):
+                return True
             
-            # Datos a enviar
-            data = {
-                "timestamp": timestamp,
-                "temperature": self.temperature,
-                "heuristic": self.name,
-                "sensor_value": sensor_value,
-                "normalized_value": normalized_sensor,
-                "output_value": output_value,
-                "error": error,
-                "target": TARGET_INTENSITY
-            }
-            
-            # Enviar a Firebase
-            return self.firebase_put(f"recocido_simulado/{timestamp}", data)
+            path = f"recocido_simulado/{timestamp}"
+            if self.outbox is not None:
+                # Al diario en disco; el hilo del outbox lo envía con reintentos
+                queued = self.outbox.enqueue(path, data)
+            else:
+                # Encolar para enviarse junto con la siguiente señal de control
+                queued = self.writer.write_log(path, data)
+            if queued:
+                self.log_filter.mark_written(sensor_value, pwm_value)
+            return queued
                 
         except Exception as e:
-            print(f"Error en log_to_firebase: {e}")
+            firebase_logger.warning("Error en log_to_firebase: %s", e)
             return False
     
+    @timed("calculate")
     def calculate_next_output(self, sensor_value):
         """
         Implementa el algoritmo de Recocido Simulado para determinar
@@ -193,23 +335,29 @@ class SimpleAnnealingController:
         normalized_sensor = sensor_value / 1023.0
         
         # Calcular error actual respecto al objetivo
-        current_error = abs(TARGET_INTENSITY - normalized_sensor)
+        current_error = abs(self.target - normalized_sensor)
         
         # Reiniciar temperatura periódicamente para escapar de óptimos locales
         if self.iteration % self.reset_temp_interval == 0 and self.iteration > 0:
-            print(f"Reiniciando temperatura a {self.initial_temp} (iteración {self.iteration})")
-            self.temperature = self.initial_temp
+            self.reset_pending = True
+        if self.reset_pending:
+            # Con muestreo adaptativo y la planta estable el reinicio se pospone hasta que el
+            # error vuelva a moverse; si no, su exploración impediría alargar el intervalo
+            if self.sampler is None or not self.sampler.is_stable():
+                logger.info("Reiniciando temperatura a %s (iteración %d)", self.initial_temp, self.iteration)
+                self.temperature = self.initial_temp
+                self.reset_pending = False
             
         # Si la temperatura ya es muy baja, usar la mejor solución encontrada
         if self.temperature <= self.min_temp:
             output = self.best_output
-            print(f"Temperatura mínima alcanzada ({self.temperature:.4f}). Usando mejor solución encontrada.")
+            logger.debug("Temperatura mínima alcanzada (%.4f). Usando mejor solución encontrada.", self.temperature)
         else:
             # Generar solución vecina
             new_output = self.create_neighbor_solution()
             
             # Predecir si el cambio nos acerca o aleja del objetivo
-            light_too_low = normalized_sensor < TARGET_INTENSITY
+            light_too_low = normalized_sensor < self.target
             
             # Estimar si el cambio es favorable
             change_is_favorable = (light_too_low and new_output > self.current_output) or \
@@ -222,7 +370,7 @@ class SimpleAnnealingController:
             else:
                 # Si no es favorable, aceptarlo con probabilidad que depende de la temperatura
                 acceptance_probability = math.exp(-current_error / self.temperature)
-                if random.random() < acceptance_probability:
+                if self.rng.random() < acceptance_probability:
                     self.current_output = new_output
             
             # Enfriar la temperatura
@@ -234,59 +382,184 @@ class SimpleAnnealingController:
         if current_error < self.best_error:
             self.best_error = current_error
             self.best_output = self.current_output
-            print(f"Nueva mejor solución: {self.best_output:.4f} (error: {self.best_error:.4f})")
+            logger.info("Nueva mejor solución", extra=fields(output=self.best_output, error=self.best_error))
             
-        # Registrar para análisis
-        self.error_history.append(current_error)
-        self.temperature_history.append(self.temperature)
+        # Guardar el error para registrarlo junto con el resto del ciclo
+        self.last_error = current_error
         
         self.iteration += 1
         return output
     
+    def record_tick(self, timestamp, sensor_value, output):
+        """Registra un ciclo completo en el historial (después de calculate_next_output)"""
+        self.history.append(timestamp, sensor_value, output, self.temperature, self.last_error)
+        self.error_stats.add(self.last_error)
+        if self.results_sink is not None:
+            self.results_sink.append(timestamp, sensor_value, output, self.temperature, self.last_error)
+        if self.archive is not None:
+            self.archive.append(timestamp, sensor_value, output, self.temperature, self.last_error)
+    
+    def run_parameters(self):
+        """Parámetros de la ejecución (encabezado del archivo de telemetría)"""
+        return {
+            "heuristic": self.name,
+            "started_at": int(time.time()),
+            "initial_temp": self.initial_temp,
+            "cooling_rate": self.cooling_rate,
+            "min_temp": self.min_temp,
+            "reset_temp_interval": self.reset_temp_interval,
+            "target": self.target,
+        }
+    
+    def stage_metrics(self):
+        """Resumen de latencia (ms) y contadores por etapa del ciclo de control"""
+        return self.metrics.summary()
+    
+    def average_error(self):
+        """Error promedio de toda la ejecución (O(1), incluye las muestras que ya salieron del historial)"""
+        return self.error_stats.mean
+    
     def save_results_to_file(self):
         """Guarda los resultados en un archivo de texto (reemplaza la generación de gráficos)"""
         try:
             with open('resultados_recocido_simulado.txt', 'w') as f:
                 f.write("RESULTADOS DE ANÁLISIS CON RECOCIDO SIMULADO\n")
                 f.write(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Duración del análisis: {len(self.timestamp_history)} muestras\n")
+                f.write(f"Duración del análisis: {self.history.total} muestras\n")
+                if self.history.total > len(self.history):
+                    f.write(f"Muestras en el historial: últimas {len(self.history)}\n")
                 f.write(f"Temperatura inicial: {self.initial_temp}\n")
                 f.write(f"Factor de enfriamiento: {self.cooling_rate}\n")
                 f.write(f"Temperatura final: {self.temperature:.4f}\n\n")
                 
-                f.write("HISTORIAL DE VALORES\n")
-                f.write("Tiempo,Sensor,Salida,Temperatura,Error\n")
-                
-                for i in range(len(self.timestamp_history)):
-                    f.write(f"{self.timestamp_history[i]:.1f},{self.sensors_history[i]},")
-                    f.write(f"{self.outputs_history[i]:.4f},{self.temperature_history[i]:.4f},")
-                    f.write(f"{self.error_history[i]:.4f}\n")
+                if self.results_sink is not None:
+                    # El historial ya se escribió ciclo a ciclo; solo se agrega el resumen
+                    f.write(f"HISTORIAL DE VALORES en '{self.results_sink.path}' "
+                            f"(ejecución {self.results_sink.run_number} del archivo)\n")
+                else:
+                    f.write("HISTORIAL DE VALORES\n")
+                    f.write("Tiempo,Sensor,Salida,Temperatura,Error\n")
+                    
+                    for timestamp, sensor, output, temperature, error in self.history.rows():
+                        f.write(f"{timestamp:.1f},{sensor:g},")
+                        f.write(f"{output:.4f},{temperature:.4f},")
+                        f.write(f"{error:.4f}\n")
                 
-                if len(self.error_history) > 0:
+                if len(self.history) > 0:
                     # Calcular estadísticas básicas
-                    avg_error = sum(self.error_history) / len(self.error_history)
+                    avg_error = self.average_error()
                     
-                    f.write(f"\nObjetivo: {TARGET_INTENSITY*100:.1f}%\n")
+                    f.write(f"\nObjetivo: {self.target*100:.1f}%\n")
                     f.write(f"Error promedio: {avg_error:.4f}\n")
+                    if self.results_sink is not None:
+                        summary = self.results_sink.summary()
+                        f.write(f"Desviación del error: {summary['std_error']:.4f}\n")
+                        f.write(f"Error máximo: {summary['max_error']:.4f}\n")
                     f.write(f"Mejor salida encontrada: {self.best_output:.4f}\n")
                     f.write(f"Mejor error logrado: {self.best_error:.4f}\n")
+                
+                stage_lines = self.metrics.format_lines()
+                if stage_lines:
+                    f.write("\nTIEMPOS POR ETAPA\n")
+                    for line in stage_lines:
+                        f.write(line + "\n")
             
             print(f"Resultados guardados en 'resultados_recocido_simulado.txt'")
             return True
         except Exception as e:
-            print(f"Error guardando resultados: {e}")
+            logger.error("Error guardando resultados: %s", e)
             return False
     
-    def run(self, duration_seconds=600, sample_interval=1):
-        """Ejecuta el controlador durante un periodo de tiempo"""
+    def run_tick(self, iteration, current_time):
+        """Ejecuta un ciclo completo: lectura, cálculo, registro y envío de la señal de control"""
+        # Leer sensor desde Firebase
+        sensor_value = self.read_sensor_from_firebase()
+        
+        # Calcular salida según el recocido simulado
+        output = self.calculate_next_output(sensor_value)
+        
+        # Loggear a Firebase cada 5 iteraciones para no saturar
+        # (se encola y viaja en el mismo PATCH que la señal de control)
+        if iteration % 5 == 0:
+            self.log_to_firebase(sensor_value, output)
+        
+        # Enviar señal de control a Firebase
+        self.send_control_signal_to_firebase(output)
+        
+        # Registrar historial
+        self.record_tick(current_time, sensor_value, output)
+        return sensor_value, output
+    
+    def next_interval(self, sample_interval, output):
+        """Intervalo hasta el siguiente ciclo (fijo, o adaptativo si hay muestreador)"""
+        if self.sampler is None:
+            return sample_interval
+        return self.sampler.update(self.last_error, output)
+    
+    def wait_for_disturbance(self, timeout):
+        """
+        Espera hasta timeout segundos. Con streaming y muestreo adaptativo se despierta
+        antes si llega una lectura cuyo error salta; devuelve True en ese caso.
+        """
+        if self.sampler is None or self.sensor_stream is None:
+            time.sleep(timeout)
+            return False
+        end = time.monotonic() + timeout
+        seen = self.sensor_stream.updates
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return False
+            seen = self.sensor_stream.wait_for_update(seen, remaining)
+            latest = self.sensor_stream.latest()
+            if latest and 'ldr_value' in latest:
+                error = abs(self.target - latest['ldr_value'] / 1023.0)
+                if self.sampler.is_disturbance(error):
+                    self.sampler.reset()
+                    logger.info("Perturbación detectada; volviendo al muestreo rápido", extra=fields(error=error))
+                    return True
+    
+    def start_background_io(self):
+        """Inicia los hilos de streaming y de envío del outbox (si están configurados)"""
+        if self.sensor_stream is not None:
+            self.sensor_stream.start()
+        if self.outbox is not None:
+            self.outbox.start()
+    
+    def finish_run(self, outbox_drain_timeout=5.0):
+        """Envía registros pendientes, realiza el análisis final y cierra conexiones y archivos"""
+        if self.sensor_stream is not None:
+            self.sensor_stream.stop()
+        self.writer.flush()
+        self.final_analysis()
+        if self.results_sink is not None:
+            self.results_sink.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.outbox is not None:
+            # Lo que no alcance a enviarse queda en el diario para la siguiente ejecución
+            self.outbox.stop(outbox_drain_timeout)
+        self.http.close()
+    
+    def run(self, duration_seconds=600, sample_interval=1, max_sample_interval=None):
+        """
+        Ejecuta el controlador durante un periodo de tiempo.
+        Con max_sample_interval el intervalo se alarga mientras el sistema está estable,
+        entre sample_interval y max_sample_interval.
+        """
         print(f"Iniciando controlador de luz con Recocido Simulado")
         print(f"Duración: {duration_seconds} segundos")
-        print(f"Objetivo de intensidad: {TARGET_INTENSITY*100}%")
+        print(f"Objetivo de intensidad: {self.target*100}%")
         print(f"Temperatura inicial: {self.temperature}")
         print(f"Factor de enfriamiento: {self.cooling_rate}")
         print(f"Temperatura mínima: {self.min_temp}")
         print(f"Obteniendo datos de Firebase y enviando resultados")
         
+        if max_sample_interval:
+            self.sampler = AdaptiveSampler(sample_interval, max_sample_interval)
+        
+        self.start_background_io()
+        
         start_time = time.time()
         iteration = 0
         
@@ -295,59 +568,171 @@ class SimpleAnnealingController:
                 # Tiempo actual relativo al inicio
                 current_time = time.time() - start_time
                 
-                # Leer sensor desde Firebase
-                sensor_value = self.read_sensor_from_firebase()
-                normalized_sensor = sensor_value / 1023.0
-                
-                # Calcular error respecto al objetivo
-                error = abs(TARGET_INTENSITY - normalized_sensor)
-                
-                # Calcular salida según el recocido simulado
-                output = self.calculate_next_output(sensor_value)
-                
-                # Enviar señal de control a Firebase
-                self.send_control_signal_to_firebase(output)
-                
-                # Registrar historial
-                self.sensors_history.append(sensor_value)
-                self.outputs_history.append(output)
-                self.timestamp_history.append(current_time)
-                
-                # Loggear a Firebase cada 5 iteraciones para no saturar
-                if iteration % 5 == 0:
-                    self.log_to_firebase(sensor_value, output)
+                sensor_value, output = self.run_tick(iteration, current_time)
                 
                 # Mostrar progreso
                 if iteration % 10 == 0:
-                    print(f"[{current_time:.1f}s] Temperatura: {self.temperature:.2f}")
-                    print(f"  Sensor={sensor_value} ({normalized_sensor:.2f}) | "
-                          f"Objetivo={TARGET_INTENSITY:.2f} | Output={output:.2f} | Error={error:.2f}")
-                    print("-" * 50)
+                    logger.info("Progreso", extra=fields(
+                        t=round(current_time, 1), temperature=self.temperature, sensor=sensor_value,
+                        normalized=sensor_value / 1023.0, target=self.target, output=output, error=self.last_error))
                 
                 iteration += 1
-                time.sleep(sample_interval)
+                self.wait_for_disturbance(self.next_interval(sample_interval, output))
+                
+        except KeyboardInterrupt:
+            print("\nControlador detenido por el usuario")
+        except Exception as e:
+            logger.exception("Error en el controlador: %s", e)
+        finally:
+            self.finish_run()
                 
+    def run_pipelined(self, duration_seconds=600, sample_interval=1, max_sample_interval=None):
+        """
+        Ejecuta el controlador con asyncio: la lectura del sensor de un ciclo se
+        solapa con las escrituras de control y registro del ciclo anterior.
+        Los ciclos se planifican contra un reloj monotónico para no acumular deriva.
+        """
+        print(f"Iniciando controlador de luz con Recocido Simulado (modo asíncrono)")
+        print(f"Duración: {duration_seconds} segundos")
+        print(f"Objetivo de intensidad: {self.target*100}%")
+        print(f"Intervalo de muestreo: {sample_interval} segundos")
+        
+        if max_sample_interval:
+            self.sampler = AdaptiveSampler(sample_interval, max_sample_interval)
+        
+        self.start_background_io()
+        
+        try:
+            asyncio.run(self._run_pipelined(duration_seconds, sample_interval))
         except KeyboardInterrupt:
             print("\nControlador detenido por el usuario")
         except Exception as e:
-            print(f"Error en el controlador: {e}")
+            logger.exception("Error en el controlador: %s", e)
         finally:
-            # Realizar análisis final
-            self.final_analysis()
+            self.finish_run()
+    
+    async def _run_pipelined(self, duration_seconds, sample_interval):
+        """Bucle de control asíncrono con plazos fijos start + k * sample_interval"""
+        start = time.monotonic()
+        end = start + duration_seconds
+        deadline = start
+        tick = 0
+        pending_writes = set()
+        control_task = None
+        
+        try:
+            while deadline < end:
+                # Esperar hasta el plazo del ciclo sin acumular el tiempo de red
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    if self.sampler is not None and self.sensor_stream is not None:
+                        # Una perturbación adelanta el ciclo al momento en que se detecta
+                        if await asyncio.to_thread(self.wait_for_disturbance, delay):
+                            deadline = time.monotonic()
+                    else:
+                        await asyncio.sleep(delay)
+                
+                lag = time.monotonic() - deadline
+                self.tick_lag_history.append(lag)
+                current_time = deadline - start
+                
+                # Lectura del sensor (las escrituras del ciclo anterior siguen en curso)
+                sensor_value = await asyncio.to_thread(self.read_sensor_from_firebase)
+                normalized_sensor = sensor_value / 1023.0
+                error = abs(self.target - normalized_sensor)
                 
+                output = self.calculate_next_output(sensor_value)
+                
+                # El registro solo se encola; viaja en el PATCH de la señal de control
+                if tick % 5 == 0:
+                    self.log_to_firebase(sensor_value, output)
+                
+                # Lanzar la escritura sin esperarla; se solapa con el siguiente ciclo.
+                # El registro se arma aquí con la temperatura de este ciclo, y cada escritura
+                # espera a la anterior para que una lenta no sobrescriba a una más reciente
+                data = self.build_control_payload(output, int(time.time()))
+                control_task = asyncio.create_task(self._send_control_after(control_task, data))
+                pending_writes.add(control_task)
+                control_task.add_done_callback(pending_writes.discard)
+                
+                self.record_tick(current_time, sensor_value, output)
+                
+                if tick % 10 == 0:
+                    logger.info("Progreso", extra=fields(
+                        t=round(current_time, 1), temperature=self.temperature, lag_ms=lag * 1000,
+                        sensor=sensor_value, normalized=normalized_sensor, target=self.target,
+                        output=output, error=error))
+                
+                tick += 1
+                
+                # Siguiente plazo; si ya pasó, se cuentan los ciclos perdidos y no se recuperan en ráfaga
+                interval = self.next_interval(sample_interval, output)
+                deadline += interval
+                now = time.monotonic()
+                if now > deadline:
+                    skipped = int((now - deadline) // interval) + 1
+                    self.missed_deadlines += skipped
+                    deadline += skipped * interval
+        finally:
+            # Esperar a que terminen las escrituras pendientes antes del análisis final
+            if pending_writes:
+                await asyncio.gather(*pending_writes, return_exceptions=True)
+    
+    async def _send_control_after(self, previous, data):
+        """Envía la señal de control cuando terminó la escritura del ciclo anterior"""
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        return await asyncio.to_thread(self.send_control_payload, data)
+    
     def final_analysis(self):
         """Realiza análisis estadístico final del rendimiento"""
         print("\n--- ANÁLISIS FINAL DEL RECOCIDO SIMULADO ---")
         
         # Calcular métricas
-        if len(self.error_history) > 0:
-            avg_error = sum(self.error_history) / len(self.error_history)
+        if len(self.history) > 0:
+            avg_error = self.average_error()
             
-            print(f"Objetivo: {TARGET_INTENSITY*100:.1f}%")
+            print(f"Objetivo: {self.target*100:.1f}%")
             print(f"Error promedio: {avg_error:.4f}")
             print(f"Mejor salida encontrada: {self.best_output:.4f}")
             print(f"Mejor error logrado: {self.best_error:.4f}")
             
+            if len(self.tick_lag_history) > 0:
+                avg_lag = self.tick_lag_history.mean("lag")
+                print(f"Retraso promedio por ciclo: {avg_lag*1000:.1f} ms")
+                print(f"Retraso máximo por ciclo: {self.tick_lag_history.maximum('lag')*1000:.1f} ms")
+                print(f"Plazos perdidos: {self.missed_deadlines}")
+            
+            stage_lines = self.metrics.format_lines()
+            if stage_lines:
+                print("Tiempos por etapa:")
+                for line in stage_lines:
+                    print(f"  {line}")
+            
+            writer_stats = self.writer.stats()
+            if writer_stats["writes"]:
+                print(f"Escrituras a Firebase: {writer_stats['writes']} en {writer_stats['requests']} peticiones")
+            
+            if self.outbox is not None:
+                outbox_stats = self.outbox.stats()
+                print(f"Outbox: {outbox_stats['sent']} escrituras enviadas en {outbox_stats['batches']} lotes, "
+                      f"{outbox_stats['pending']} pendientes en '{self.outbox.path}'")
+            
+            breaker_stats = self.breaker.stats()
+            if breaker_stats["opens"]:
+                print(f"Circuito abierto {breaker_stats['opens']} veces; "
+                      f"{breaker_stats['rejected']} llamadas atendidas con valores de respaldo")
+            
+            suppressed_controls = self.control_filter.suppressed
+            suppressed_logs = self.log_filter.suppressed
+            if suppressed_controls or suppressed_logs:
+                print(f"Escrituras omitidas sin cambios: {suppressed_controls} de control, {suppressed_logs} de registro")
+            
+            if self.sampler is not None:
+                sampler_stats = self.sampler.stats()
+                print(f"Intervalo de muestreo promedio: {sampler_stats['avg_interval']:.2f} s "
+                      f"(regresos al muestreo rápido: {sampler_stats['resets']})")
+            
             # Guardar resultados en archivo
             self.save_results_to_file()
             
@@ -359,72 +744,194 @@ class SimpleAnnealingController:
                     "initial_temp": self.initial_temp,
                     "cooling_rate": self.cooling_rate,
                     "final_temp": self.temperature,
-                    "target": TARGET_INTENSITY,
+                    "target": self.target,
                     "best_output": self.best_output,
                     "best_error": self.best_error
                 }
+                if len(self.tick_lag_history) > 0:
+                    final_result["avg_tick_lag"] = self.tick_lag_history.mean("lag")
+                    final_result["missed_deadlines"] = self.missed_deadlines
+                if self.sampler is not None:
+                    final_result["avg_sample_interval"] = self.sampler.average_interval()
                 
                 # Enviar a Firebase
-                if self.firebase_put("resultados_finales/" + str(int(time.time())), final_result):
+                results_path = "resultados_finales/" + str(int(time.time()))
+                if self.outbox is not None:
+                    self.outbox.enqueue(results_path, final_result)
+                    print("Resultados finales guardados en el outbox para su envío")
+                elif self.firebase_put(results_path, final_result):
                     print("Resultados finales enviados a Firebase")
                 else:
                     print("Error al enviar resultados finales a Firebase")
                     
             except Exception as e:
-                print(f"Error enviando resultados finales a Firebase: {e}")
+                logger.error("Error enviando resultados finales a Firebase: %s", e)
+    
+HISTORICAL_CSV = 'datos_historicos_ldr.csv'
+
+def _load_fetch_checkpoint(checkpoint_path):
+    """Lee el cursor de la última página descargada (o None si no existe)"""
+    try:
+        with open(checkpoint_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_fetch_checkpoint(checkpoint_path, checkpoint):
+    """Guarda el cursor de forma atómica para poder reanudar la descarga"""
+    temp_path = checkpoint_path + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(temp_path, checkpoint_path)
+
+def iter_sensor_pages(controller, start_at=None, skip_keys=(), page_size=200, end_at=None):
+    """
+    Recorre los registros de sensores en Firebase por páginas ordenadas por timestamp.
+    Cada página se entrega como lista de (clave, registro) en orden; las claves de
+    skip_keys (ya procesadas con el timestamp start_at) se descartan.
+    Lanza ConnectionError si una página no se puede obtener.
+    """
+    last_timestamp = start_at
+    seen = set(skip_keys)
+    request_size = page_size
+    while True:
+        # startAt es inclusivo: se vuelven a pedir los registros del último timestamp
+        query = f"?orderBy=\"timestamp\"&limitToFirst={request_size}"
+        if last_timestamp is not None:
+            query += f"&startAt={last_timestamp}"
+        if end_at is not None:
+            query += f"&endAt={end_at}"
+        
+        page = controller.firebase_get("sensores", query)
+        if page is None:
+            raise ConnectionError("no se pudo obtener la página de sensores")
+        if not isinstance(page, dict) or not page:
+            return
+        
+        records = sorted(
+            ((key, value) for key, value in page.items()
+             if key not in seen and isinstance(value, dict)
+             and 'ldr_value' in value and 'timestamp' in value),
+            key=lambda item: item[1]['timestamp']
+        )
+        if not records:
+            if len(page) < request_size:
+                return  # No hay más datos
+            # Página llena de registros con el mismo timestamp: pedir una más grande
+            request_size *= 2
+            continue
+        request_size = page_size
+        
+        yield records
+        
+        # Cursor: último timestamp y las claves ya entregadas con ese timestamp
+        newest = records[-1][1]['timestamp']
+        if newest != last_timestamp:
+            seen = set()
+        seen.update(key for key, value in records if value['timestamp'] == newest)
+        last_timestamp = newest
+        
+        if len(page) < request_size:
+            return  # Última página
+
+def fetch_historical_data(controller, page_size=200, max_records=None, end_at=None,
+                          path=HISTORICAL_CSV, resume=True, cache=None):
+    """
+    Descarga los datos históricos de Firebase por páginas ordenadas por timestamp
+    y las escribe directamente en el CSV. Tras cada página se guarda un cursor,
+    de modo que una descarga interrumpida continúa donde se quedó.
+    Con una caché local solo se descargan los registros nuevos y el CSV se genera desde ella.
+    Devuelve el número de registros en el CSV o None si no se pudo descargar nada.
+    """
+    if cache is not None:
+        return _fetch_historical_data_cached(controller, cache, page_size, max_records, end_at, path)
     
-def fetch_historical_data(controller):
-    """Obtiene datos históricos de Firebase para análisis offline"""
     print("Obteniendo datos históricos de Firebase...")
+    checkpoint_path = path + ".cursor"
+    checkpoint = _load_fetch_checkpoint(checkpoint_path) if resume and os.path.exists(path) else None
+    if checkpoint is None:
+        # Descarga nueva: se reinicia el CSV
+        checkpoint = {"last_timestamp": None, "last_keys": [], "records": 0}
+        with open(path, 'w') as f:
+            f.write("timestamp,ldr_value,datetime\n")
+    else:
+        print(f"Reanudando descarga desde timestamp {checkpoint['last_timestamp']} "
+              f"({checkpoint['records']} registros ya guardados)")
+    
+    downloaded = 0
     try:
-        # Obtener los últimos 200 registros de sensores
-        sensor_data = controller.firebase_get("sensores", "?orderBy=\"timestamp\"&limitToLast=200")
-        
-        if sensor_data and isinstance(sensor_data, dict):
-            # Convertir a listas para análisis
-            timestamps = []
-            values = []
-            datetimes = []
-            
-            for key, value in sensor_data.items():
-                if 'ldr_value' in value and 'timestamp' in value:
-                    timestamps.append(value['timestamp'])
-                    values.append(value.get('ldr_value', 0))
-                    datetimes.append(datetime.fromtimestamp(value['timestamp']))
-            
-            if timestamps:
-                # Ordenar por timestamp
-                sorted_data = sorted(zip(timestamps, values, datetimes), key=lambda x: x[0])
-                timestamps = [x[0] for x in sorted_data]
-                values = [x[1] for x in sorted_data]
-                datetimes = [x[2] for x in sorted_data]
+        with open(path, 'a') as f:
+            pages = iter_sensor_pages(controller, checkpoint["last_timestamp"], checkpoint["last_keys"],
+                                      page_size, end_at)
+            for records in pages:
+                if max_records is not None:
+                    records = records[:max_records - downloaded]
                 
-                print(f"Datos obtenidos: {len(timestamps)} registros")
+                for key, value in records:
+                    timestamp = value['timestamp']
+                    d = datetime.fromtimestamp(timestamp)
+                    f.write(f"{timestamp},{value.get('ldr_value', 0)},{d.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.flush()
                 
-                # Guardar datos en CSV
-                with open('datos_historicos_ldr.csv', 'w') as f:
-                    f.write("timestamp,ldr_value,datetime\n")
-                    for t, v, d in zip(timestamps, values, datetimes):
-                        f.write(f"{t},{v},{d.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                print("Datos guardados en 'datos_historicos_ldr.csv'")
+                # Cursor: último timestamp y las claves ya escritas con ese timestamp
+                last_timestamp = records[-1][1]['timestamp']
+                last_keys = [key for key, value in records if value['timestamp'] == last_timestamp]
+                if last_timestamp == checkpoint["last_timestamp"]:
+                    last_keys.extend(checkpoint["last_keys"])
+                checkpoint = {
+                    "last_timestamp": last_timestamp,
+                    "last_keys": last_keys,
+                    "records": checkpoint["records"] + len(records),
+                }
+                _save_fetch_checkpoint(checkpoint_path, checkpoint)
+                downloaded += len(records)
+                logger.info("Página descargada", extra=fields(records=len(records), total=checkpoint['records']))
                 
-                return timestamps, values, datetimes
-            else:
-                print("No se encontraron datos históricos")
-                return None, None, None
-        else:
+                if max_records is not None and downloaded >= max_records:
+                    break
+    except Exception as e:
+        logger.error("Error en fetch_historical_data: %s", e)
+        if checkpoint["records"] == 0:
             print("Error al obtener datos o formato incorrecto")
-            return None, None, None
+            return None
+        print("La descarga se puede reanudar desde el último cursor guardado")
+    
+    if checkpoint["records"] == 0:
+        print("No se encontraron datos históricos")
+        return None
+    
+    print(f"Datos obtenidos: {downloaded} registros nuevos")
+    print(f"Datos guardados en '{path}' ({checkpoint['records']} registros)")
+    return checkpoint["records"]
+
+def _fetch_historical_data_cached(controller, cache, page_size, max_records, end_at, path):
+    """Sincroniza la caché local con Firebase y exporta el CSV desde ella"""
+    print("Sincronizando caché local de sensores con Firebase...")
+    try:
+        added = cache.sync(controller, page_size=page_size, max_records=max_records, end_at=end_at)
+        print(f"Registros nuevos en caché: {added}")
     except Exception as e:
-        print(f"Error en fetch_historical_data: {e}")
-        return None, None, None
+        logger.error("Error sincronizando la caché: %s", e)
+        print("Se usarán los datos ya guardados en la caché")
+    
+    total = cache.export_csv(path)
+    if total == 0:
+        print("No se encontraron datos históricos")
+        return None
+    print(f"Datos guardados en '{path}' ({total} registros)")
+    return total
 
-def analyze_historical_with_sa(timestamps, values):
-    """Analiza datos históricos utilizando el algoritmo de Recocido Simulado"""
-    if not timestamps or not values:
-        print("No hay datos históricos para analizar")
-        return
-        
+def load_historical_values(path=HISTORICAL_CSV):
+    """Lee en streaming los valores del LDR guardados por fetch_historical_data"""
+    with open(path) as f:
+        next(f, None)  # Encabezado
+        for line in f:
+            columns = line.strip().split(",")
+            if len(columns) >= 2:
+                yield float(columns[1])
+
+def analyze_historical_with_sa(values, seed=None):
+    """Analiza datos históricos (cualquier iterable de valores del LDR) utilizando el algoritmo de Recocido Simulado"""
     print("Analizando datos históricos con Recocido Simulado...")
     
     # Parámetros del recocido simulado
@@ -432,33 +939,36 @@ def analyze_historical_with_sa(timestamps, values):
     cooling_rate = 0.95
     min_temp = 0.1
     
-    sa_controller = SimpleAnnealingController(initial_temp, cooling_rate, min_temp)
+    sa_controller = SimpleAnnealingController(initial_temp, cooling_rate, min_temp, seed=seed)
     
     # Usar los datos históricos para simular el paso del tiempo
-    for i in range(len(timestamps)):
-        # Extraer valor del sensor
-        sensor_value = values[i]
-        
+    for i, sensor_value in enumerate(values):
         # Calcular salida según el recocido simulado
         output = sa_controller.calculate_next_output(sensor_value)
         
         # Registrar para análisis
-        sa_controller.sensors_history.append(sensor_value)
-        sa_controller.outputs_history.append(output)
-        sa_controller.timestamp_history.append(i)
+        sa_controller.record_tick(i, sensor_value, output)
+    
+    if len(sa_controller.history) == 0:
+        print("No hay datos históricos para analizar")
+        return
         
     # Análisis final con los datos históricos
     sa_controller.final_analysis()
 
 if __name__ == "__main__":
+    # Mensajes del bucle de control por un hilo de fondo, sin bloquear los ciclos
+    configure_logging()
+    
     # Opciones disponibles para ejecutar
     print("SISTEMA DE CONTROL DE INTENSIDAD LUMÍNICA CON RECOCIDO SIMULADO")
     print("Selecciona una opción:")
     print("1. Ejecutar controlador en tiempo real con Firebase")
     print("2. Analizar datos históricos de Firebase")
     print("3. Ejecutar ambos (análisis histórico y controlador en tiempo real)")
+    print("4. Barrido de hiperparámetros sobre datos históricos")
     
-    option = input("Opción (1/2/3): ")
+    option = input("Opción (1/2/3/4): ")
     
     controller = SimpleAnnealingController()
     
@@ -471,28 +981,56 @@ if __name__ == "__main__":
         # Duración del análisis
         duration = int(input("Duración del análisis en segundos (predeterminado: 600): ") or "600")
         sample_interval = float(input("Intervalo de muestreo en segundos (predeterminado: 1): ") or "1")
+        max_sample_interval = float(input("Intervalo máximo para muestreo adaptativo "
+                                          "(0=desactivado, predeterminado: 0): ") or "0")
+        run_mode = input("Modo de ejecución (1=secuencial, 2=asíncrono, predeterminado: 1): ") or "1"
+        use_stream = (input("¿Leer sensores por streaming? (s/n, predeterminado: n): ") or "n").lower() == 's'
         
         # Crear y ejecutar el controlador
         controller = SimpleAnnealingController(
             initial_temp=initial_temp, 
             cooling_rate=cooling_rate, 
-            min_temp=min_temp
+            min_temp=min_temp,
+            use_stream=use_stream,
+            results_log='resultados_recocido_simulado.csv',
+            archive_path='resultados_recocido_simulado.tlm',
+            outbox_path='firebase_outbox.journal'
         )
         
         # Si seleccionó opción 3, primero hacemos el análisis histórico
         if option == '3':
-            timestamps, values, _ = fetch_historical_data(controller)
-            if timestamps and values:
-                analyze_historical_with_sa(timestamps, values)
+            from sensor_cache import SensorCache
+            
+            cache = SensorCache()
+            if fetch_historical_data(controller, cache=cache):
+                analyze_historical_with_sa(cache.iter_values())
             
         # Ejecutar el controlador en tiempo real
-        controller.run(duration, sample_interval)
+        if run_mode == '2':
+            controller.run_pipelined(duration, sample_interval, max_sample_interval)
+        else:
+            controller.run(duration, sample_interval, max_sample_interval)
     
     elif option == '2':
-        # Solo análisis histórico
-        timestamps, values, _ = fetch_historical_data(controller)
-        if timestamps and values:
-            analyze_historical_with_sa(timestamps, values)
+        # Solo análisis histórico (la caché local evita volver a descargar el historial)
+        from sensor_cache import SensorCache
+        
+        cache = SensorCache()
+        if fetch_historical_data(controller, cache=cache):
+            analyze_historical_with_sa(cache.iter_values())
+    
+    elif option == '4':
+        # Barrido paralelo de parámetros sobre los datos históricos
+        from sa_sweep import run_sweep, print_ranking
+        from sensor_cache import SensorCache
+        
+        num_seeds = int(input("Semillas por configuración (predeterminado: 10): ") or "10")
+        cache = SensorCache()
+        if fetch_historical_data(controller, cache=cache):
+            start = time.time()
+            ranking = run_sweep(list(cache.iter_values()), seeds=range(num_seeds))
+            print(f"Barrido completado: {len(ranking)} configuraciones en {time.time() - start:.1f} s")
+            print_ranking(ranking)
     
     else:
         print("Opción no válida. Saliendo...")
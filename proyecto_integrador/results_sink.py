@@ -0,0 +1,179 @@
+"""
+Registro incremental de resultados del controlador
+Escribe cada ciclo en un CSV de solo anexado con flush y fsync periódicos, rotación por tamaño o tiempo
+y estadísticas acumuladas para que el resumen final sea O(1); cada ejecución empieza con su propio encabezado
+Usa solo bibliotecas estándar de Python
+"""
+
+import os
+import math
+import time
+
+CSV_HEADER = "Tiempo,Sensor,Salida,Temperatura,Error\n"
+
+
+class RunningStats:
+    """Media, desviación, mínimo y máximo acumulados (algoritmo de Welford)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / self.count) if self.count > 1 else 0.0
+
+
+class ResultsSink:
+    def __init__(self, path, flush_every=10, flush_interval=1.0, fsync_interval=5.0,
+                 max_bytes=10 * 1024 * 1024, rotate_interval=None, backup_count=5):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+
+        # Estadísticas de toda la ejecución, independientes de la rotación
+        self.error_stats = RunningStats()
+        self.output_stats = RunningStats()
+        self.sensor_stats = RunningStats()
+        self.last_temperature = None
+        # Número de la ejecución dentro del archivo (cada una comienza con un encabezado)
+        self.run_number = 1
+
+        self._file = None
+        self._pending_rows = 0
+        self._bytes_written = 0
+        self._opened_at = 0.0
+        self._last_flush = 0.0
+        self._last_fsync = 0.0
+        self._open(new_run=True)
+
+    def _open(self, new_run=False):
+        """
+        Abre el archivo en modo anexado y escribe el encabezado si es nuevo. Al iniciar una
+        ejecución sobre un archivo con datos, el encabezado se repite como separador de ejecuciones.
+        """
+        separator = ""
+        if new_run and os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb') as f:
+                self.run_number = sum(1 for line in f if line == CSV_HEADER.encode('utf-8')) + 1
+                f.seek(-1, os.SEEK_END)
+                # Una fila incompleta por una interrupción no debe pegarse al encabezado
+                if f.read(1) != b"\n":
+                    separator = "\n"
+        self._file = open(self.path, 'a', buffering=64 * 1024, encoding='utf-8')
+        self._bytes_written = self._file.tell()
+        if self._bytes_written == 0 or new_run:
+            self._file.write(separator + CSV_HEADER)
+            self._bytes_written += len(separator) + len(CSV_HEADER)
+        now = time.monotonic()
+        self._opened_at = self._last_flush = self._last_fsync = now
+
+    def _sync(self):
+        """Vacía el buffer y fuerza la escritura a disco"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending_rows = 0
+        self._last_flush = self._last_fsync = time.monotonic()
+
+    def _rotate(self):
+        """Cierra el archivo actual y lo renombra como respaldo numerado"""
+        self._sync()
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        # La ejecución continúa como la primera del archivo nuevo
+        self.run_number = 1
+        self._open()
+
+    def append(self, timestamp, sensor, output, temperature, error):
+        """Escribe un ciclo y actualiza las estadísticas acumuladas"""
+        line = f"{timestamp:.1f},{sensor:g},{output:.4f},{temperature:.4f},{error:.4f}\n"
+        self._file.write(line)
+        self._bytes_written += len(line)
+        self._pending_rows += 1
+
+        self.error_stats.add(error)
+        self.output_stats.add(output)
+        self.sensor_stats.add(sensor)
+        self.last_temperature = temperature
+
+        now = time.monotonic()
+        if self.max_bytes and self._bytes_written >= self.max_bytes:
+            self._rotate()
+        elif self.rotate_interval and now - self._opened_at >= self.rotate_interval:
+            self._rotate()
+        elif now - self._last_fsync >= self.fsync_interval:
+            self._sync()
+        elif self._pending_rows >= self.flush_every or now - self._last_flush >= self.flush_interval:
+            self._file.flush()
+            self._pending_rows = 0
+            self._last_flush = now
+
+    def summary(self):
+        """Devuelve el resumen de la ejecución sin recorrer el archivo"""
+        return {
+            "samples": self.error_stats.count,
+            "avg_error": self.error_stats.mean,
+            "std_error": self.error_stats.std,
+            "min_error": self.error_stats.minimum,
+            "max_error": self.error_stats.maximum,
+            "avg_output": self.output_stats.mean,
+            "avg_sensor": self.sensor_stats.mean,
+            "final_temp": self.last_temperature,
+        }
+
+    def close(self):
+        """Vacía, sincroniza y cierra el archivo"""
+        if self._file is not None and not self._file.closed:
+            self._sync()
+            self._file.close()
+
+
+def iter_runs(path):
+    """
+    Lee el CSV de ResultsSink ejecución por ejecución: cada encabezado marca el inicio de una
+    ejecución y se produce la lista de sus filas (tuplas de float). Las filas incompletas se omiten.
+    """
+    rows = None
+    columns = CSV_HEADER.count(",") + 1
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line == CSV_HEADER:
+                if rows is not None:
+                    yield rows
+                rows = []
+                continue
+            if rows is None:
+                raise ValueError(f"Encabezado inesperado en '{path}'")
+            values = line.strip().split(",")
+            if len(values) != columns:
+                continue
+            try:
+                rows.append(tuple(map(float, values)))
+            except ValueError:
+                continue
+    if rows is not None:
+        yield rows
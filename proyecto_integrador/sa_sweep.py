@@ -0,0 +1,140 @@
+"""
+Barrido paralelo de hiperparámetros del Recocido Simulado sobre datos históricos
+Cada configuración se reproduce con su propio generador aleatorio sembrado y se reparte en un pool de procesos
+Usa solo bibliotecas estándar de Python
+"""
+
+import os
+import math
+import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from proyecto_integrador import SimpleAnnealingController, load_historical_values
+from control_logging import quiet_logging
+
+# Rejilla predeterminada de parámetros a evaluar
+DEFAULT_GRID = {
+    "initial_temp": [25, 50, 100, 200],
+    "cooling_rate": [0.8, 0.9, 0.95, 0.99],
+    "min_temp": [0.01, 0.1, 1.0],
+    "reset_temp_interval": [25, 50, 100],
+}
+
+# Aporte del foco a la lectura del LDR con salida al 100% (fracción de la escala 0-1023).
+# Los datos históricos solo registran la luz medida, así que la reproducción suma este
+# aporte para que la salida del controlador influya en el error.
+DEFAULT_LAMP_GAIN = 0.3
+
+# Error por debajo del cual se considera que el controlador convergió
+DEFAULT_CONVERGENCE_TOL = 0.05
+
+_worker_values = None
+_worker_lamp_gain = DEFAULT_LAMP_GAIN
+_worker_convergence_tol = DEFAULT_CONVERGENCE_TOL
+
+
+def replay_configuration(values, initial_temp, cooling_rate, min_temp, reset_temp_interval, seed,
+                         lamp_gain=DEFAULT_LAMP_GAIN, convergence_tol=DEFAULT_CONVERGENCE_TOL):
+    """Reproduce la serie histórica con una configuración y semilla; devuelve sus métricas"""
+    controller = SimpleAnnealingController(initial_temp, cooling_rate, min_temp, history_capacity=1,
+                                           reset_temp_interval=reset_temp_interval, seed=seed)
+    output = controller.current_output
+    total_error = 0.0
+    converged_at = None
+
+    # El controlador registra cada mejora; en el barrido solo interesan advertencias y errores
+    with quiet_logging():
+        for tick, ambient in enumerate(values):
+            sensor_value = max(0, min(1023, ambient + lamp_gain * 1023 * output))
+            output = controller.calculate_next_output(sensor_value)
+            total_error += controller.last_error
+            if converged_at is None and controller.last_error <= convergence_tol:
+                converged_at = tick
+
+    return {
+        "avg_error": total_error / len(values),
+        "best_error": controller.best_error,
+        "converged_at": converged_at,
+    }
+
+
+def _init_worker(values, lamp_gain, convergence_tol):
+    """Copia la serie histórica una sola vez en cada proceso del pool"""
+    global _worker_values, _worker_lamp_gain, _worker_convergence_tol
+    _worker_values = values
+    _worker_lamp_gain = lamp_gain
+    _worker_convergence_tol = convergence_tol
+
+
+def _run_task(task):
+    params, seed = task
+    result = replay_configuration(_worker_values, *params, seed,
+                                  lamp_gain=_worker_lamp_gain, convergence_tol=_worker_convergence_tol)
+    return params, result
+
+
+def run_sweep(values, grid=None, seeds=range(10), processes=None,
+              lamp_gain=DEFAULT_LAMP_GAIN, convergence_tol=DEFAULT_CONVERGENCE_TOL):
+    """
+    Evalúa todas las combinaciones de la rejilla con cada semilla en paralelo.
+    Devuelve una lista de resultados ordenada por error promedio (mejor primero).
+    """
+    grid = grid or DEFAULT_GRID
+    configurations = list(itertools.product(grid["initial_temp"], grid["cooling_rate"],
+                                            grid["min_temp"], grid["reset_temp_interval"]))
+    seeds = list(seeds)
+    tasks = [(params, seed) for params in configurations for seed in seeds]
+
+    processes = processes or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (processes * 4))
+
+    # Acumular métricas por configuración sobre todas las semillas
+    totals = {params: {"avg_error": 0.0, "best_error": 0.0, "converged": 0, "converged_ticks": 0}
+              for params in configurations}
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(list(values), lamp_gain, convergence_tol)) as executor:
+        for params, result in executor.map(_run_task, tasks, chunksize=chunksize):
+            entry = totals[params]
+            entry["avg_error"] += result["avg_error"]
+            entry["best_error"] += result["best_error"]
+            if result["converged_at"] is not None:
+                entry["converged"] += 1
+                entry["converged_ticks"] += result["converged_at"]
+
+    ranking = []
+    for params, entry in totals.items():
+        initial_temp, cooling_rate, min_temp, reset_temp_interval = params
+        ranking.append({
+            "initial_temp": initial_temp,
+            "cooling_rate": cooling_rate,
+            "min_temp": min_temp,
+            "reset_temp_interval": reset_temp_interval,
+            "avg_error": entry["avg_error"] / len(seeds),
+            "best_error": entry["best_error"] / len(seeds),
+            "converged_rate": entry["converged"] / len(seeds),
+            "convergence_ticks": (entry["converged_ticks"] / entry["converged"]
+                                  if entry["converged"] else math.inf),
+        })
+    ranking.sort(key=lambda row: (row["avg_error"], row["convergence_ticks"]))
+    return ranking
+
+
+def print_ranking(ranking, top=20):
+    """Muestra la tabla de las mejores configuraciones"""
+    print(f"{'#':>3} {'T0':>7} {'Enfr.':>6} {'Tmin':>6} {'Reinicio':>8} "
+          f"{'Error prom.':>11} {'Mejor error':>11} {'Conv.':>6} {'Ciclos':>7}")
+    for position, row in enumerate(ranking[:top], 1):
+        ticks = f"{row['convergence_ticks']:.1f}" if row['convergence_ticks'] != math.inf else "-"
+        print(f"{position:>3} {row['initial_temp']:>7g} {row['cooling_rate']:>6g} {row['min_temp']:>6g} "
+              f"{row['reset_temp_interval']:>8g} {row['avg_error']:>11.4f} {row['best_error']:>11.4f} "
+              f"{row['converged_rate']*100:>5.0f}% {ticks:>7}")
+
+
+if __name__ == "__main__":
+    values = list(load_historical_values())
+    print(f"Valores históricos cargados: {len(values)}")
+    start = time.time()
+    ranking = run_sweep(values)
+    print(f"Barrido completado: {len(ranking)} configuraciones en {time.time() - start:.1f} s")
+    print_ranking(ranking)
@@ -0,0 +1,103 @@
+"""
+Caché local en disco del historial de sensores de Firebase
+Guarda los registros en SQLite (modo WAL) indexados por timestamp y solo descarga lo nuevo
+Usa solo bibliotecas estándar de Python
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+
+from proyecto_integrador import iter_sensor_pages
+
+SENSOR_CACHE_DB = 'sensores_cache.db'
+
+
+class SensorCache:
+    def __init__(self, path=SENSOR_CACHE_DB):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS sensores ("
+            " key TEXT PRIMARY KEY,"
+            " timestamp INTEGER NOT NULL,"
+            " ldr_value REAL NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_sensores_timestamp ON sensores (timestamp, key)")
+        self.connection.commit()
+
+    def high_water_mark(self):
+        """Devuelve (timestamp más reciente, claves con ese timestamp) o (None, [])"""
+        row = self.connection.execute("SELECT MAX(timestamp) FROM sensores").fetchone()
+        if row[0] is None:
+            return None, []
+        keys = [key for (key,) in self.connection.execute(
+            "SELECT key FROM sensores WHERE timestamp = ?", (row[0],))]
+        return row[0], keys
+
+    def insert(self, records):
+        """Inserta una página de (clave, registro) en una sola transacción"""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO sensores (key, timestamp, ldr_value, data) VALUES (?, ?, ?, ?)",
+                ((key, int(value['timestamp']), value.get('ldr_value', 0), json.dumps(value))
+                 for key, value in records)
+            )
+
+    def sync(self, controller, page_size=200, max_records=None, end_at=None):
+        """Descarga solo los registros posteriores a la marca de agua; devuelve cuántos se agregaron"""
+        start_at, skip_keys = self.high_water_mark()
+        added = 0
+        for records in iter_sensor_pages(controller, start_at, skip_keys, page_size, end_at):
+            if max_records is not None:
+                records = records[:max_records - added]
+            # Cada página se confirma por separado: una interrupción no pierde lo descargado
+            self.insert(records)
+            added += len(records)
+            if max_records is not None and added >= max_records:
+                break
+        return added
+
+    def count(self, start_at=None, end_at=None):
+        """Número de registros en el rango de timestamps"""
+        where, params = self._range(start_at, end_at)
+        return self.connection.execute(f"SELECT COUNT(*) FROM sensores{where}", params).fetchone()[0]
+
+    def iter_records(self, start_at=None, end_at=None):
+        """Itera (timestamp, ldr_value) en orden cronológico sin cargar todo en memoria"""
+        where, params = self._range(start_at, end_at)
+        return self.connection.execute(
+            f"SELECT timestamp, ldr_value FROM sensores{where} ORDER BY timestamp, key", params)
+
+    def iter_values(self, start_at=None, end_at=None):
+        """Itera solo los valores del LDR en orden cronológico"""
+        return (value for _, value in self.iter_records(start_at, end_at))
+
+    def export_csv(self, path, start_at=None, end_at=None):
+        """Escribe el rango en el formato de datos_historicos_ldr.csv; devuelve el número de filas"""
+        total = 0
+        with open(path, 'w') as f:
+            f.write("timestamp,ldr_value,datetime\n")
+            for timestamp, value in self.iter_records(start_at, end_at):
+                d = datetime.fromtimestamp(timestamp)
+                f.write(f"{timestamp},{value:g},{d.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                total += 1
+        return total
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def _range(start_at, end_at):
+        """Construye la cláusula WHERE para un rango de timestamps"""
+        clauses, params = [], []
+        if start_at is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start_at)
+        if end_at is not None:
+            clauses.append("timestamp <= ?")
+            params.append(end_at)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
@@ -0,0 +1,140 @@
+"""
+Instrumentación de latencia por etapa del bucle de control
+Histogramas log-lineales tipo HDR (registro O(1), memoria fija) y contadores por etapa
+Usa solo bibliotecas estándar de Python
+"""
+
+import time
+import functools
+import threading
+from array import array
+
+# 2^4 = 16 sub-buckets por potencia de 2: error relativo máximo ~6%
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+
+class LatencyHistogram:
+    def __init__(self, max_value_ns=2 ** 36):
+        # Valores mayores que max_value_ns (~68 s) se acumulan en el último bucket
+        max_shift = max(0, max_value_ns.bit_length() - (SUB_BUCKET_BITS + 1))
+        self._counts = array('Q', bytes(8 * (max_shift + 2) * SUB_BUCKETS))
+        self._last_index = len(self._counts) - 1
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = 0
+
+    @staticmethod
+    def _index(value):
+        """Bucket de un valor: exacto por debajo de 16 ns y log-lineal por encima"""
+        if value < SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - (SUB_BUCKET_BITS + 1)
+        return shift * SUB_BUCKETS + (value >> shift)
+
+    @staticmethod
+    def _bucket_value(index):
+        """Valor representativo (punto medio) de un bucket"""
+        if index < SUB_BUCKETS:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        sub = index - shift * SUB_BUCKETS
+        return (sub << shift) + ((1 << shift) >> 1)
+
+    def record(self, value_ns):
+        """Registra una medición en nanosegundos"""
+        value_ns = max(0, int(value_ns))
+        self._counts[min(self._index(value_ns), self._last_index)] += 1
+        self.count += 1
+        self.total += value_ns
+        if self.minimum is None or value_ns < self.minimum:
+            self.minimum = value_ns
+        if value_ns > self.maximum:
+            self.maximum = value_ns
+
+    def percentile(self, fraction):
+        """Valor en nanosegundos por debajo del cual queda la fracción indicada de mediciones"""
+        if self.count == 0:
+            return 0
+        target = max(1, int(fraction * self.count + 0.5))
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            if bucket_count:
+                seen += bucket_count
+                if seen >= target:
+                    return min(max(self._bucket_value(index), self.minimum), self.maximum)
+        return self.maximum
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        """Resumen en milisegundos"""
+        return {
+            "count": self.count,
+            "mean_ms": self.mean() / 1e6,
+            "p50_ms": self.percentile(0.50) / 1e6,
+            "p95_ms": self.percentile(0.95) / 1e6,
+            "p99_ms": self.percentile(0.99) / 1e6,
+            "max_ms": self.maximum / 1e6,
+        }
+
+
+class StageMetrics:
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, value_ns):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(value_ns)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        """Devuelve {etapa: resumen de latencia} y los contadores"""
+        with self._lock:
+            return {
+                "stages": {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+                "counters": dict(self.counters),
+            }
+
+    def format_lines(self):
+        """Líneas de texto con el resumen por etapa, para consola o archivo"""
+        summary = self.summary()
+        lines = []
+        for stage, stats in summary["stages"].items():
+            lines.append(f"{stage}: n={stats['count']} | media={stats['mean_ms']:.3f} ms | "
+                         f"p50={stats['p50_ms']:.3f} ms | p95={stats['p95_ms']:.3f} ms | "
+                         f"p99={stats['p99_ms']:.3f} ms | máx={stats['max_ms']:.3f} ms")
+        for name, value in summary["counters"].items():
+            lines.append(f"{name}: {value}")
+        return lines
+
+
+def timed(stage):
+    """
+    Decorador para métodos del controlador: mide cada llamada en self.metrics
+    y cuenta como fallo las llamadas que devuelven False.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter_ns()
+            result = None
+            try:
+                result = method(self, *args, **kwargs)
+                return result
+            finally:
+                self.metrics.record(stage, time.perf_counter_ns() - start)
+                if result is False:
+                    self.metrics.increment(f"{stage}_failures")
+        return wrapper
+    return decorator
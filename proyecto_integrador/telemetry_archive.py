@@ -0,0 +1,187 @@
+"""
+Archivo binario compacto de la telemetría de una ejecución del controlador
+Registros de ancho fijo (tiempo, sensor, salida, temperatura, error) tras un encabezado con los
+parámetros de la ejecución; lectura por mmap con acceso aleatorio y conversión desde/hacia CSV
+Usa solo bibliotecas estándar de Python (NumPy solo para leer columnas como arreglos)
+"""
+
+import os
+import json
+import mmap
+import time
+import struct
+
+from results_sink import CSV_HEADER, iter_runs
+
+MAGIC = b"LDRSA01\n"
+# Tiempo en float64 (segundos desde el inicio o timestamp Unix); el resto en float32
+RECORD = struct.Struct("<dffff")
+FIELDS = ("timestamp", "sensor", "output", "temperature", "error")
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+def _data_offset(header_size):
+    """Los registros empiezan alineados a 8 bytes después del encabezado"""
+    return (len(MAGIC) + _HEADER_LENGTH.size + header_size + 7) // 8 * 8
+
+
+def _run_path(path, params):
+    """Nombre libre para conservar el archivo de otra ejecución: base_AAAAMMDD_HHMMSS.ext"""
+    started_at = params.get("started_at")
+    if not isinstance(started_at, (int, float)):
+        started_at = os.path.getmtime(path)
+    root, extension = os.path.splitext(path)
+    stem = f"{root}_{time.strftime('%Y%m%d_%H%M%S', time.localtime(started_at))}"
+    candidate = stem + extension
+    suffix = 1
+    while os.path.exists(candidate):
+        suffix += 1
+        candidate = f"{stem}_{suffix}{extension}"
+    return candidate
+
+
+class TelemetryArchiveWriter:
+    def __init__(self, path, params=None, flush_every=100):
+        """
+        Crea el archivo con los parámetros de la ejecución (diccionario serializable a JSON).
+        Cada escritor es una ejecución nueva: un archivo existente se renombra con la fecha
+        de inicio de su ejecución y se crea uno nuevo (TelemetryArchive ignora un registro
+        incompleto al final del anterior).
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self._pending = 0
+        header = json.dumps(params or {}, sort_keys=True).encode('utf-8')
+        self.params = json.loads(header)
+        self.rotated_path = None
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            try:
+                with TelemetryArchive(path) as existing:
+                    previous_params = existing.params
+            except ValueError:
+                previous_params = {}
+            self.rotated_path = _run_path(path, previous_params)
+            os.replace(path, self.rotated_path)
+
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+        self._file.write(b"\0" * (_data_offset(len(header)) - self._file.tell()))
+
+    def append(self, timestamp, sensor, output, temperature, error):
+        """Escribe un ciclo (misma firma que ResultsSink.append)"""
+        self._file.write(RECORD.pack(timestamp, sensor, output, temperature, error))
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._file.flush()
+            self._pending = 0
+
+    def close(self):
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TelemetryArchive:
+    def __init__(self, path):
+        """Abre un archivo de telemetría en solo lectura mediante mmap"""
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"'{path}' no es un archivo de telemetría")
+        (header_size,) = _HEADER_LENGTH.unpack_from(self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        self.params = json.loads(self._mmap[header_start:header_start + header_size].decode('utf-8'))
+        self.data_offset = _data_offset(header_size)
+        # Un registro incompleto al final (escritura interrumpida) se ignora
+        self._count = max(0, (len(self._mmap) - self.data_offset) // RECORD.size)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        """Registro index como tupla (tiempo, sensor, salida, temperatura, error)"""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return RECORD.unpack_from(self._mmap, self.data_offset + index * RECORD.size)
+
+    def __iter__(self):
+        for offset in range(self.data_offset, self.data_offset + self._count * RECORD.size, RECORD.size):
+            yield RECORD.unpack_from(self._mmap, offset)
+
+    def arrays(self):
+        """
+        Arreglo estructurado de NumPy sobre el mmap, sin copiar datos; cada campo
+        (arrays()['error'], ...) es una vista. Liberar las vistas antes de close().
+        """
+        import numpy as np
+        dtype = np.dtype([("timestamp", "<f8"), ("sensor", "<f4"), ("output", "<f4"),
+                          ("temperature", "<f4"), ("error", "<f4")])
+        return np.frombuffer(self._mmap, dtype=dtype, count=self._count, offset=self.data_offset)
+
+    def column(self, name):
+        """Vista de NumPy de una sola columna"""
+        return self.arrays()[name]
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Aún hay arreglos de NumPy apuntando al mmap; se libera cuando se destruyan
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def csv_to_archive(csv_path, archive_path, params=None, run=-1):
+    """
+    Convierte una ejecución (por defecto la última) del registro CSV de ResultsSink al formato
+    binario; devuelve el número de registros
+    """
+    runs = list(iter_runs(csv_path))
+    if not runs:
+        raise ValueError(f"Encabezado inesperado en '{csv_path}'")
+    with TelemetryArchiveWriter(archive_path, params, flush_every=10000) as writer:
+        for values in runs[run]:
+            writer.append(*values)
+    return len(runs[run])
+
+
+def archive_to_csv(archive_path, csv_path):
+    """Convierte un archivo binario al CSV de ResultsSink; devuelve el número de registros"""
+    total = 0
+    with TelemetryArchive(archive_path) as archive, open(csv_path, 'w') as f:
+        f.write(CSV_HEADER)
+        for timestamp, sensor, output, temperature, error in archive:
+            f.write(f"{timestamp:.1f},{sensor:g},{output:.4f},{temperature:.4f},{error:.4f}\n")
+            total += 1
+    return total
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Uso: python telemetry_archive.py entrada.csv salida.tlm  |  entrada.tlm salida.csv")
+        sys.exit(1)
+    source, destination = sys.argv[1], sys.argv[2]
+    if source.endswith(".csv"):
+        count = csv_to_archive(source, destination)
+    else:
+        count = archive_to_csv(source, destination)
+    print(f"{count} registros convertidos: '{source}' -> '{destination}'")
@@ -0,0 +1,59 @@
+"""
+Supresión de escrituras repetidas hacia Firebase con banda muerta y latido
+Una escritura se omite si sus valores cuantizados no se alejaron más que la banda muerta
+de los últimos escritos, salvo que haya pasado el intervalo máximo sin escribir
+Usa solo bibliotecas estándar de Python
+"""
+
+import time
+import threading
+
+
+class DeadbandFilter:
+    def __init__(self, deadband=0, heartbeat_interval=30.0, clock=time.monotonic):
+        """
+        deadband: cambio máximo que se considera "sin cambio"; un número o una tupla con
+        una banda por cada valor comparado
+        heartbeat_interval: segundos máximos sin escribir aunque el valor no cambie
+        """
+        self.deadband = deadband
+        self.heartbeat_interval = heartbeat_interval
+        self.clock = clock
+        self._last_values = None
+        self._last_time = None
+        self._lock = threading.Lock()
+
+        self.written = 0
+        self.suppressed = 0
+
+    def _bands(self, count):
+        if isinstance(self.deadband, (tuple, list)):
+            return self.deadband
+        return (self.deadband,) * count
+
+    def should_write(self, *values):
+        """Indica si los valores deben escribirse; cuenta como suprimida la escritura omitida"""
+        with self._lock:
+            if self._last_values is not None and self.clock() - self._last_time < self.heartbeat_interval:
+                bands = self._bands(len(values))
+                if all(abs(value - last) <= band for value, last, band in zip(values, self._last_values, bands)):
+                    self.suppressed += 1
+                    return False
+            return True
+
+    def mark_written(self, *values):
+        """Registra los valores escritos con éxito (referencia para la banda muerta y el latido)"""
+        with self._lock:
+            self._last_values = values
+            self._last_time = self.clock()
+            self.written += 1
+
+    def reset(self):
+        """Olvida el último valor escrito: la siguiente escritura no se suprime"""
+        with self._lock:
+            self._last_values = None
+            self._last_time = None
+
+    def stats(self):
+        with self._lock:
+            return {"written": self.written, "suppressed": self.suppressed}
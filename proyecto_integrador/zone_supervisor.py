@@ -0,0 +1,208 @@
+"""
+Supervisor de varias zonas de iluminación controladas con Recocido Simulado
+Lee las últimas lecturas de todas las zonas en una sola petición, calcula todas las salidas
+en un mismo paso y envía todas las señales de control en un solo PATCH multi-ruta
+Usa solo bibliotecas estándar de Python
+"""
+
+import json
+import os
+import time
+
+from proyecto_integrador import SimpleAnnealingController, FIREBASE_URL
+from firebase_pool import FirebaseConnectionPool
+from firebase_writer import WriteBehindBuffer
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from control_logging import get_logger, fields, configure_logging
+
+# Nodo donde cada zona publica su última lectura: sensores_zonas/{zona} = {timestamp, ldr_value}
+ZONE_READINGS_PATH = "sensores_zonas"
+
+logger = get_logger("zonas")
+
+
+class ZoneSupervisor:
+    def __init__(self, zones, readings_path=ZONE_READINGS_PATH, pool_size=4, history_capacity=3600,
+                 firebase_url=None, request_timeout=10.0, tick_budget=None):
+        """
+        zones: diccionario {id_zona: parámetros del controlador}, por ejemplo
+        {"sala": {"target": 0.65, "initial_temp": 100, "cooling_rate": 0.95}}
+        tick_budget: segundos por ciclo; si se indica, cada llamada dispone de la mitad
+        """
+        self.readings_path = readings_path
+        self.request_timeout = tick_budget / 2 if tick_budget else request_timeout
+        self.http = FirebaseConnectionPool(firebase_url or FIREBASE_URL, max_connections=pool_size,
+                                           timeout=self.request_timeout)
+        # Mismo interruptor que el controlador de una zona: una petición colgada no detiene el ciclo
+        self.breaker = CircuitBreaker(slow_call_threshold=0.8 * self.request_timeout)
+        self.writer = WriteBehindBuffer(self.firebase_patch, log_batch_size=max(5, len(zones)))
+
+        # Un estado de controlador independiente por zona
+        self.zones = {}
+        for zone_id, params in zones.items():
+            controller = SimpleAnnealingController(history_capacity=history_capacity, **params)
+            controller.name = f"Recocido Simulado ({zone_id})"
+            self.zones[zone_id] = controller
+
+        self.iteration = 0
+
+    def firebase_get(self, path):
+        """Lee un nodo de Firebase reutilizando conexiones del pool"""
+        try:
+            status, body = self.breaker.request(self.http, "GET", f"{path.strip('/')}.json")
+            if status == 200:
+                return json.loads(body.decode('utf-8'))
+            return None
+        except CircuitOpenError:
+            return None
+        except Exception as e:
+            logger.warning("Error en firebase_get: %s", e)
+            return None
+
+    def firebase_patch(self, path, data):
+        """Actualiza varias rutas de Firebase en una sola petición PATCH"""
+        try:
+            data_json = json.dumps(data).encode('utf-8')
+            status, _ = self.breaker.request(self.http, "PATCH", f"{path.strip('/')}.json", body=data_json,
+                                             headers={'Content-Type': 'application/json'})
+            return status == 200
+        except CircuitOpenError:
+            return False
+        except Exception as e:
+            logger.warning("Error en firebase_patch: %s", e)
+            return False
+
+    def read_all_zones(self):
+        """Obtiene la lectura de todas las zonas con una sola petición"""
+        latest = self.firebase_get(self.readings_path)
+        if not isinstance(latest, dict):
+            latest = {}
+
+        readings = {}
+        for zone_id, controller in self.zones.items():
+            record = latest.get(zone_id)
+            if isinstance(record, dict) and 'ldr_value' in record:
+                controller.last_firebase_data = record
+                readings[zone_id] = record.get('ldr_value', 512)
+            else:
+                # Sin lectura nueva para la zona: último valor conocido o simulación
+                readings[zone_id] = controller.fallback_sensor_value()
+        return readings
+
+    def step(self, readings):
+        """Calcula en un mismo paso la siguiente salida de todas las zonas"""
+        return {zone_id: controller.calculate_next_output(readings[zone_id])
+                for zone_id, controller in self.zones.items()}
+
+    def send_all_zones(self, readings, outputs):
+        """Envía las señales de control de todas las zonas en un solo PATCH"""
+        timestamp = int(time.time())
+        # Registrar análisis cada 5 iteraciones; viajan en el mismo PATCH que el control
+        if self.iteration % 5 == 0:
+            for zone_id, controller in self.zones.items():
+                self.writer.write_log(f"recocido_simulado/{zone_id}/{timestamp}",
+                                      controller.build_log_payload(readings[zone_id], outputs[zone_id], timestamp))
+        controls = {f"control/{zone_id}/{timestamp}": controller.build_control_payload(outputs[zone_id], timestamp)
+                    for zone_id, controller in self.zones.items()}
+        return self.writer.write_controls(controls)
+
+    def run(self, duration_seconds=600, sample_interval=1):
+        """Ejecuta todas las zonas durante un periodo de tiempo con plazos fijos"""
+        print(f"Iniciando supervisor de {len(self.zones)} zonas con Recocido Simulado")
+        print(f"Duración: {duration_seconds} segundos")
+
+        start = time.monotonic()
+        deadline = start
+        try:
+            while deadline - start < duration_seconds:
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                current_time = deadline - start
+
+                readings = self.read_all_zones()
+                outputs = self.step(readings)
+                self.send_all_zones(readings, outputs)
+
+                for zone_id, controller in self.zones.items():
+                    controller.record_tick(current_time, readings[zone_id], outputs[zone_id])
+
+                if self.iteration % 10 == 0:
+                    for zone_id, controller in self.zones.items():
+                        logger.info("Progreso", extra=fields(
+                            t=round(current_time, 1), zone=zone_id, sensor=readings[zone_id],
+                            target=controller.target, output=outputs[zone_id], error=controller.last_error))
+
+                self.iteration += 1
+                deadline += sample_interval
+                # Si el ciclo se retrasó, continuar desde el siguiente plazo sin ráfagas
+                now = time.monotonic()
+                if now > deadline:
+                    deadline += (int((now - deadline) // sample_interval) + 1) * sample_interval
+
+        except KeyboardInterrupt:
+            print("\nSupervisor detenido por el usuario")
+        except Exception as e:
+            logger.exception("Error en el supervisor: %s", e)
+        finally:
+            self.writer.flush()
+            self.final_analysis()
+            self.http.close()
+
+    def final_analysis(self):
+        """Resume el rendimiento de cada zona y envía los resultados en un solo PATCH"""
+        print("\n--- ANÁLISIS FINAL POR ZONA ---")
+        timestamp = int(time.time())
+        results = {}
+        for zone_id, controller in self.zones.items():
+            if len(controller.history) == 0:
+                continue
+            avg_error = controller.average_error()
+            print(f"{zone_id}: Objetivo={controller.target*100:.1f}% | Error promedio={avg_error:.4f} | "
+                  f"Mejor salida={controller.best_output:.4f} | Mejor error={controller.best_error:.4f}")
+            results[f"resultados_finales/{zone_id}/{timestamp}"] = {
+                "timestamp": timestamp,
+                "avg_error": avg_error,
+                "initial_temp": controller.initial_temp,
+                "cooling_rate": controller.cooling_rate,
+                "final_temp": controller.temperature,
+                "target": controller.target,
+                "best_output": controller.best_output,
+                "best_error": controller.best_error
+            }
+
+        stats = self.writer.stats()
+        if stats["writes"]:
+            print(f"Escrituras a Firebase: {stats['writes']} en {stats['requests']} peticiones")
+
+        breaker_stats = self.breaker.stats()
+        if breaker_stats["opens"]:
+            print(f"Circuito abierto {breaker_stats['opens']} veces; "
+                  f"{breaker_stats['rejected']} llamadas atendidas con valores de respaldo")
+
+        if results:
+            if self.firebase_patch("", results):
+                print("Resultados finales enviados a Firebase")
+            else:
+                print("Error al enviar resultados finales a Firebase")
+
+
+def load_zones(path='zonas.json'):
+    """Lee la configuración de zonas desde un archivo JSON {id_zona: parámetros}"""
+    with open(path) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    configure_logging()
+    if os.path.exists('zonas.json'):
+        zones = load_zones()
+    else:
+        # Configuración de ejemplo con dos zonas
+        zones = {
+            "zona_1": {"target": 0.65},
+            "zona_2": {"target": 0.5, "initial_temp": 50, "cooling_rate": 0.9},
+        }
+    duration = int(input("Duración en segundos (predeterminado: 600): ") or "600")
+    sample_interval = float(input("Intervalo de muestreo en segundos (predeterminado: 1): ") or "1")
+    ZoneSupervisor(zones, tick_budget=sample_interval).run(duration, sample_interval)